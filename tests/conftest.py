@@ -1,33 +1,167 @@
 """``pytest`` configuration."""
 
+import asyncio
+import functools
+import hashlib
+import os
+import struct
 import warnings
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import httpx
 import pytest
 from rasterio.errors import NotGeoreferencedWarning
 from rasterio.io import MemoryFile
 from starlette.testclient import TestClient
 
+PREFIX = os.path.join(os.path.dirname(__file__), "fixtures")
+
+warnings.filterwarnings("ignore", category=NotGeoreferencedWarning, module="rasterio")
+
+
+# PNG IHDR color type -> number of bands
+_PNG_BANDS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# JPEG Start Of Frame markers (SOF0-SOF15 except DHT, JPG and DAC)
+_JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _parse_fast(content: bytes) -> Optional[Dict[Any, Any]]:
+    """Read width/height/count/driver from PNG or JPEG headers."""
+    if content[:8] == b"\x89PNG\r\n\x1a\n":
+        width, height = struct.unpack(">II", content[16:24])
+        return {
+            "driver": "PNG",
+            "width": width,
+            "height": height,
+            "count": _PNG_BANDS[content[25]],
+        }
+
+    if content[:2] == b"\xff\xd8":
+        offset = 2
+        while offset + 4 <= len(content):
+            if content[offset] != 0xFF:
+                return None
+
+            marker = content[offset + 1]
+            (length,) = struct.unpack(">H", content[offset + 2 : offset + 4])
+            if marker in _JPEG_SOF:
+                height, width, count = struct.unpack(
+                    ">HHB", content[offset + 5 : offset + 10]
+                )
+                return {
+                    "driver": "JPEG",
+                    "width": width,
+                    "height": height,
+                    "count": count,
+                }
+
+            offset += 2 + length
+
+    return None
+
+
+def _parse(content: bytes) -> Dict[Any, Any]:
+    if meta := _parse_fast(content):
+        return meta
+
+    with MemoryFile(content) as mem:
+        with mem.open() as dst:
+            return {
+                "driver": dst.driver,
+                "width": dst.width,
+                "height": dst.height,
+                "count": dst.count,
+            }
+
+
+class _ImageBody:
+    """Image body, hashed and compared by its digest (used as cache key)."""
+
+    __slots__ = ("content", "digest")
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.digest = hashlib.blake2b(content, digest_size=16).digest()
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _ImageBody) and self.digest == other.digest
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_cached(body: _ImageBody) -> Dict[Any, Any]:
+    return _parse(body.content)
+
 
 def parse_img(content: bytes) -> Dict[Any, Any]:
     """Read tile image and return metadata."""
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore",
-            category=NotGeoreferencedWarning,
-            module="rasterio",
-        )
-        with MemoryFile(content) as mem:
-            with mem.open() as dst:
-                return dst.profile
+    # Return a copy so callers can't modify the cached metadata
+    return dict(_parse_cached(_ImageBody(content)))
+
+
+def assert_img(response, media_type: str, **expected: Any) -> Dict[Any, Any]:
+    """Check image response status, media type and metadata."""
+    assert response.status_code == 200
+    assert response.headers["content-type"] == media_type
+
+    meta = parse_img(response.content)
+
+    headers = response.headers
+    if "x-image-width" in headers:
+        assert int(headers["x-image-width"]) == meta["width"]
+        assert int(headers["x-image-height"]) == meta["height"]
+
+    for key, value in expected.items():
+        assert meta[key] == value, (key, meta[key], value)
 
+    return meta
 
-@pytest.fixture(autouse=True)
-def app(monkeypatch):
-    """Create app."""
-    monkeypatch.setenv("TITILER_IMAGE_IIIF_MAX_WIDTH", "2000")
 
-    from titiler.image.main import app
+@pytest.fixture(scope="session", autouse=True)
+def _warm_gdal():
+    """Register GDAL drivers once, before the first test runs."""
+    with open(os.path.join(PREFIX, "boston_small.jpg"), "rb") as f:
+        with MemoryFile(f.read()) as mem:
+            mem.open().close()
+
+
+@pytest.fixture(scope="session")
+def boston_mem():
+    """Serve `boston.jpg` from GDAL's in-memory filesystem."""
+    with open(os.path.join(PREFIX, "boston.jpg"), "rb") as f:
+        with MemoryFile(f.read(), filename="boston.jpg") as mem:
+            yield mem.name
+
+
+@pytest.fixture(scope="session")
+def _titiler_app():
+    """Import the FastAPI application (once per test session)."""
+    # `monkeypatch` is function-scoped, so we use a session-wide context instead.
+    # Settings are read at import time, which also happens only once per session.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("TITILER_IMAGE_IIIF_MAX_WIDTH", "2000")
+
+        from titiler.image.main import app
 
-    with TestClient(app) as app:
         yield app
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app(_titiler_app):
+    """Create app (once per test session)."""
+    with TestClient(_titiler_app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def async_client(_titiler_app):
+    """Session-wide AsyncClient calling the ASGI app directly."""
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=_titiler_app),
+        base_url="http://testserver",
+    )
+    yield client
+    asyncio.run(client.aclose())
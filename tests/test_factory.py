@@ -0,0 +1,48 @@
+"""test Factory helpers."""
+
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.testclient import TestClient
+
+from .conftest import assert_img
+
+PREFIX = os.path.join(os.path.dirname(__file__), "fixtures")
+
+boston_jpeg = os.path.join(PREFIX, "boston_small.jpg")
+
+
+def test_mount_to(app):
+    """Mount factory routes under a prefix."""
+    # Settings are read at import time (after the `app` fixture sets them)
+    from titiler.image.factory import LocalTilerFactory
+
+    factory = LocalTilerFactory(router_prefix="/local")
+    paths = [route.path for route in factory.router.routes]
+
+    local_app = FastAPI()
+    factory.mount_to(local_app, prefix="/local", tags=["Local"])
+
+    # The factory's own router is not modified
+    assert [route.path for route in factory.router.routes] == paths
+    routes = [r for r in local_app.router.routes if isinstance(r, APIRoute)]
+    assert [route.path for route in routes] == [f"/local{path}" for path in paths]
+    assert all(route.tags == ["Local"] for route in routes)
+    assert not any(route.tags for route in factory.router.routes)
+
+    with TestClient(local_app) as client:
+        response = client.get("/local/tilejson.json", params={"url": boston_jpeg})
+        assert response.status_code == 200
+        tiles = response.json()["tiles"]
+        assert tiles[0].startswith("http://testserver/local/tiles/{z}/{x}/{y}?")
+
+        response = client.get("/local/tiles/0/0/0.png", params={"url": boston_jpeg})
+        assert_img(response, "image/png", width=256, height=256)
+
+        response = client.get("/tiles/0/0/0.png", params={"url": boston_jpeg})
+        assert response.status_code == 404
+
+    with pytest.raises(ValueError):
+        LocalTilerFactory().mount_to(FastAPI(), prefix="/{name}")
@@ -0,0 +1,201 @@
+"""test Geo Tiler Factory endpoints (GCPS and Cutline)."""
+
+import functools
+import json
+import os
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from titiler.image import dependencies
+
+from .conftest import assert_img
+
+PREFIX = os.path.join(os.path.dirname(__file__), "fixtures")
+
+cog_no_gcps = os.path.join(PREFIX, "cog_no_gcps.tif")
+cog_geojson = os.path.join(PREFIX, "cog_no_gcps.geojson")
+
+# Tile covering the center of `cog_no_gcps.tif` once georeferenced
+TILE = "/geo/tiles/WebMercatorQuad/8/182/120.png"
+
+CUTLINE = {
+    "type": "Polygon",
+    "coordinates": [
+        [[76.0, 9.5], [77.5, 9.5], [77.5, 10.8], [76.0, 10.8], [76.0, 9.5]]
+    ],
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    """Parse GeoJSON files with orjson (memory-mapped) or with json."""
+    if request.param == "json":
+        monkeypatch.setattr(dependencies, "orjson", None)
+
+    dependencies.get_gcps.cache_clear()
+    dependencies.get_cutline.cache_clear()
+    yield request.param
+    dependencies.get_gcps.cache_clear()
+    dependencies.get_cutline.cache_clear()
+
+
+@pytest.fixture
+def http_files(app, tmp_path):
+    """Serve GCPS and Cutline files over HTTP (from a temporary directory)."""
+    # Start without a shared HTTP client
+    app.portal.call(dependencies.close_http_client)
+
+    shutil.copy(cog_geojson, tmp_path / "gcps.geojson")
+    (tmp_path / "cutline.geojson").write_text(json.dumps(CUTLINE))
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(Handler, directory=str(tmp_path))
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    dependencies.get_gcps.cache_clear()
+    dependencies.get_cutline.cache_clear()
+    yield f"http://127.0.0.1:{server.server_port}"
+    dependencies.get_gcps.cache_clear()
+    dependencies.get_cutline.cache_clear()
+
+    server.shutdown()
+    server.server_close()
+
+
+def _inline_gcps(step: int):
+    """Return every `step` GCPS from the GeoJSON file as `row,col,lon,lat,alt` strings."""
+    with open(cog_geojson) as f:
+        features = json.load(f)["features"][::step]
+
+    return [
+        ",".join(
+            map(
+                str,
+                [
+                    feat["properties"]["resourceCoords"][1],
+                    feat["properties"]["resourceCoords"][0],
+                    *feat["geometry"]["coordinates"],
+                ],
+            )
+        )
+        for feat in features
+    ]
+
+
+def test_gcps_file(app, json_backend):
+    """GCPS from a GeoJSON file."""
+    response = app.get(
+        "/geo/tilejson.json", params={"url": cog_no_gcps, "gcps_file": cog_geojson}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["minzoom"] == 7
+    assert body["maxzoom"] == 10
+    assert body["bounds"] == pytest.approx([75.605, 9.226, 78.204, 11.190], abs=1e-3)
+    assert "gcps_file=" in body["tiles"][0]
+
+    # Second request uses the cached GCPS
+    response = app.get(TILE, params={"url": cog_no_gcps, "gcps_file": cog_geojson})
+    assert_img(response, "image/png", width=256, height=256)
+
+
+def test_gcps_cutline_http(app, http_files):
+    """GCPS and Cutline files fetched over HTTP with a shared client."""
+    response = app.get(
+        TILE,
+        params={
+            "url": cog_no_gcps,
+            "gcps_file": f"{http_files}/gcps.geojson",
+            "cutline_file": f"{http_files}/cutline.geojson",
+        },
+    )
+    meta = assert_img(response, "image/png", width=256, height=256)
+    assert meta["count"] == 2
+
+    # Both files were fetched with the same (lazily created) client
+    assert dependencies._http_client.cache_info().misses == 1
+    client = dependencies._http_client()
+    assert not client.is_closed
+
+    # The client is closed on application shutdown (and re-created on next use)
+    app.portal.call(dependencies.close_http_client)
+    assert client.is_closed
+    assert dependencies._http_client.cache_info().currsize == 0
+
+
+def test_gcps_inline(app):
+    """GCPS from query parameters."""
+    params = {"url": cog_no_gcps, "gcps": _inline_gcps(10)}
+    response = app.get("/geo/tilejson.json", params=params)
+    assert response.status_code == 200
+    assert response.json()["bounds"] == pytest.approx(
+        [75.605, 9.226, 78.204, 11.190], abs=0.1
+    )
+
+    response = app.get(TILE, params=params)
+    assert_img(response, "image/png", width=256, height=256)
+
+    # Inline GCPS and Cutline take precedence: the files are not fetched
+    response = app.get(
+        "/geo/tilejson.json",
+        params={
+            **params,
+            "gcps_file": "/nonexistent/gcps.geojson",
+            "cutline": "POLYGON ((76 9.5, 77.5 9.5, 77.5 10.8, 76 10.8, 76 9.5))",
+            "cutline_file": "https://nonexistent.invalid/cutline.geojson",
+        },
+    )
+    assert response.status_code == 200
+
+    response = app.get(
+        "/geo/tilejson.json", params={"url": cog_no_gcps, "gcps": _inline_gcps(200)}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Need at least 3 gcps to wrap an image."
+
+
+def test_cutline_file(app, json_backend, tmp_path):
+    """Cutline from a GeoJSON file (Feature or Geometry)."""
+    feature = tmp_path / "cutline_feature.geojson"
+    feature.write_text(
+        json.dumps({"type": "Feature", "geometry": CUTLINE, "properties": {}})
+    )
+
+    multi = tmp_path / "cutline_multi.geojson"
+    multi.write_text(
+        json.dumps({"type": "MultiPolygon", "coordinates": [CUTLINE["coordinates"]]})
+    )
+
+    for cutline_file in [feature, multi]:
+        response = app.get(
+            TILE,
+            params={
+                "url": cog_no_gcps,
+                "gcps_file": cog_geojson,
+                "cutline_file": str(cutline_file),
+            },
+        )
+        meta = assert_img(response, "image/png", width=256, height=256)
+        assert meta["count"] == 2  # gray + alpha
+
+    point = tmp_path / "cutline_point.geojson"
+    point.write_text(json.dumps({"type": "Point", "coordinates": [76.5, 10.0]}))
+    response = app.get(
+        TILE,
+        params={
+            "url": cog_no_gcps,
+            "gcps_file": cog_geojson,
+            "cutline_file": str(point),
+        },
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid GeoJSON type: Point."
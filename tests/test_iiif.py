@@ -1,22 +1,25 @@
 """Test titiler.image IIIF endpoints."""
 
+import asyncio
 import os
-import urllib
+import urllib.parse
 
-from .conftest import parse_img
+import pytest
+
+from .conftest import assert_img
 
 PREFIX = os.path.join(os.path.dirname(__file__), "fixtures")
 
 boston_jpeg = os.path.join(PREFIX, "boston_small.jpg")
+boston_identifier = urllib.parse.quote_plus(boston_jpeg, safe="")
 
 
 def test_iiif_information_endpoints(app):
     """Test info endpoints."""
-    identifier = urllib.parse.quote_plus(boston_jpeg, safe="")
 
     # # Make sure we got redirected
     # response = app.get(
-    #     f"/iiif/{identifier}",
+    #     f"/iiif/{boston_identifier}",
     #     follow_redirects=True,
     #     headers={"accept": "application/json"},
     # )
@@ -26,7 +29,7 @@ def test_iiif_information_endpoints(app):
     # bodyr = response.json()
     # assert bodyr["id"] == response.history[0].url
 
-    response = app.get(f"/iiif/{identifier}/info.json")
+    response = app.get(f"/iiif/{boston_identifier}/info.json")
     assert response.status_code == 200
     assert response.headers["content-type"] == "application/json"
     body = response.json()
@@ -35,7 +38,7 @@ def test_iiif_information_endpoints(app):
     assert body["height"] == 695
 
     response = app.get(
-        f"/iiif/{identifier}/info.json",
+        f"/iiif/{boston_identifier}/info.json",
         headers={"accept": "application/ld+json"},
     )
     assert response.status_code == 200
@@ -44,281 +47,146 @@ def test_iiif_information_endpoints(app):
         == 'application/ld+json;profile="http://iiif.io/api/image/3/context.json"'
     )
     body = response.json()
+    assert body["@context"] == "http://iiif.io/api/image/3/context.json"
     assert body["type"] == "ImageService3"
     assert body["width"] == 1000
     assert body["height"] == 695
 
 
-def test_iiif_image_endpoint(app):
-    """Test image endpoints."""
-    identifier = urllib.parse.quote_plus(boston_jpeg, safe="")
-
+# (suffix, expected metadata)
+IMAGE_CASES = [
     ###########################################################################
     # REGION
     # region=full
-    response = app.get(f"/iiif/{identifier}/full/max/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1000
-    assert meta["height"] == 695
-    assert meta["count"] == 3
-    assert meta["driver"] == "JPEG"
-
-    # region=square
-    response = app.get(f"/iiif/{identifier}/square/max/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == meta["height"]
-
+    (
+        "full/max/0/default.jpg",
+        {"width": 1000, "height": 695, "count": 3, "driver": "JPEG"},
+    ),
     # region=x,y,w,h
-    response = app.get(f"/iiif/{identifier}/0,0,10,20/max/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 10
-    assert meta["height"] == 20
-
+    ("0,0,10,20/max/0/default.jpg", {"width": 10, "height": 20}),
     # region=extends beyond
-    response = app.get(f"/iiif/{identifier}/0,0,1005,700/max/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1000
-    assert meta["height"] == 695
-    assert meta["count"] == 3
-    assert meta["driver"] == "JPEG"
-
+    (
+        "0,0,1005,700/max/0/default.jpg",
+        {"width": 1000, "height": 695, "count": 3, "driver": "JPEG"},
+    ),
     # region=pct:x,y,w,h
-    response = app.get(f"/iiif/{identifier}/pct:10,10,10,10/max/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 100
-    assert meta["height"] == 70
-
-    # region=Invalid
-    response = app.get(f"/iiif/{identifier}/yo/max/0/default.jpg")
-    assert response.status_code == 400
-
-    # region=Invalid
-    response = app.get(f"/iiif/{identifier}/pct:105,100,100,100/max/0/default.jpg")
-    assert response.status_code == 400
-
-    # invalid region
-    response = app.get(f"/iiif/{identifier}/0,1000,100,100/max/0/default.jpg")
-    assert response.status_code == 400
-
+    ("pct:10,10,10,10/max/0/default.jpg", {"width": 100, "height": 70}),
     ###########################################################################
     # FORMAT
     # format=png
-    response = app.get(f"/iiif/{identifier}/full/max/0/default.png")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/png"
-    meta = parse_img(response.content)
-    assert meta["count"] == 4
-    assert meta["driver"] == "PNG"
-
+    # no masked pixels: no alpha band
+    ("full/max/0/default.png", {"count": 3, "driver": "PNG"}),
+    # masked corners: alpha band
+    ("full/max/45/default.png", {"count": 4, "driver": "PNG"}),
     ###########################################################################
     # ROTATION
     # rotation=90
-    response = app.get(f"/iiif/{identifier}/full/max/90/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 695
-    assert meta["height"] == 1000
-
+    ("full/max/90/default.jpg", {"width": 695, "height": 1000}),
     # rotation=180
-    response = app.get(f"/iiif/{identifier}/full/max/180/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1000
-    assert meta["height"] == 695
-
+    ("full/max/180/default.jpg", {"width": 1000, "height": 695}),
     # rotation=-90
-    response = app.get(f"/iiif/{identifier}/full/max/!90/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 695
-    assert meta["height"] == 1000
-
-    # rotation=invalid
-    response = app.get(f"/iiif/{identifier}/full/max/!900/default.jpg")
-    assert response.status_code == 400
-
+    ("full/max/!90/default.jpg", {"width": 695, "height": 1000}),
     ###########################################################################
     # QUALITY
-    response = app.get(f"/iiif/{identifier}/full/max/0/gray.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1000
-    assert meta["height"] == 695
-    assert meta["count"] == 1
-
-    response = app.get(f"/iiif/{identifier}/full/max/0/bitonal.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1000
-    assert meta["height"] == 695
-    assert meta["count"] == 1
-
-    response = app.get(f"/iiif/{identifier}/full/max/0/color.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1000
-    assert meta["height"] == 695
-    assert meta["count"] == 3
-
+    ("full/max/0/gray.jpg", {"width": 1000, "height": 695, "count": 1}),
+    ("full/max/0/bitonal.jpg", {"width": 1000, "height": 695, "count": 1}),
+    ("full/max/0/color.jpg", {"width": 1000, "height": 695, "count": 3}),
     ###########################################################################
     # SIZE
     # size: ^max (upscale to server maxwidth: 2000)
-    response = app.get(f"/iiif/{identifier}/full/^max/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 2000
-    assert meta["height"] == 1390
-
+    ("full/^max/0/default.jpg", {"width": 2000, "height": 1390}),
     # size: pct:n
-    response = app.get(f"/iiif/{identifier}/full/pct:50/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 500
-    assert meta["height"] == 348
-
-    # size: pct invalid
-    response = app.get(f"/iiif/{identifier}/full/pct:-50/0/default.jpg")
-    assert response.status_code == 400
-
-    response = app.get(f"/iiif/{identifier}/full/^pct:-50/0/default.jpg")
-    assert response.status_code == 400
-
-    # do not allow upscale without ^
-    response = app.get(f"/iiif/{identifier}/full/pct:150/0/default.jpg")
-    assert response.status_code == 400
-
+    ("full/pct:50/0/default.jpg", {"width": 500, "height": 348}),
     # size: ^pct:n
-    response = app.get(f"/iiif/{identifier}/full/^pct:150/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1500
-    assert meta["height"] == 1042
-
+    ("full/^pct:150/0/default.jpg", {"width": 1500, "height": 1042}),
     # size: ^pct:n but limit to server limit
-    response = app.get(f"/iiif/{identifier}/full/^pct:300/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 2000
-    assert meta["height"] == 1390
-
+    ("full/^pct:300/0/default.jpg", {"width": 2000, "height": 1390}),
     # size: w,
-    response = app.get(f"/iiif/{identifier}/full/500,/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 500
-    assert meta["height"] == 348
-
-    # Do not allow upscale
-    response = app.get(f"/iiif/{identifier}/full/1500,/0/default.jpg")
-    assert response.status_code == 400
-
+    ("full/500,/0/default.jpg", {"width": 500, "height": 348}),
     # size: ^w,
-    response = app.get(f"/iiif/{identifier}/full/^1500,/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1500
-    assert meta["height"] == 1042
-
+    ("full/^1500,/0/default.jpg", {"width": 1500, "height": 1042}),
     # size: ,h
-    response = app.get(f"/iiif/{identifier}/full/,348/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 501
-    assert meta["height"] == 348
-
-    # Do not allow upscale
-    response = app.get(f"/iiif/{identifier}/full/,1042/0/default.jpg")
-    assert response.status_code == 400
-
+    ("full/,348/0/default.jpg", {"width": 501, "height": 348}),
     # size: ^,h
-    response = app.get(f"/iiif/{identifier}/full/^,1042/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1499
-    assert meta["height"] == 1042
-
+    ("full/^,1042/0/default.jpg", {"width": 1499, "height": 1042}),
     # size: w,h
-    response = app.get(f"/iiif/{identifier}/full/100,50/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 100
-    assert meta["height"] == 50
-
-    # Do not allow upscale
-    response = app.get(f"/iiif/{identifier}/full/1500,1000/0/default.jpg")
-    assert response.status_code == 400
-
+    ("full/100,50/0/default.jpg", {"width": 100, "height": 50}),
     # size: ^w,h
-    response = app.get(f"/iiif/{identifier}/full/^1500,1000/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1500
-    assert meta["height"] == 1000
-
+    ("full/^1500,1000/0/default.jpg", {"width": 1500, "height": 1000}),
     # size: !w,h (maintain aspect ratio)
-    response = app.get(f"/iiif/{identifier}/full/!750,800/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 750
-    assert meta["height"] == 521
-
-    # Do not allow upscale
-    response = app.get(f"/iiif/{identifier}/full/!1500,800/0/default.jpg")
-    assert response.status_code == 400
-
+    ("full/!750,800/0/default.jpg", {"width": 750, "height": 521}),
     # size: ^!w,h (maintain aspect ratio)
-    response = app.get(f"/iiif/{identifier}/full/^!1500,800/0/default.jpg")
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 1500
-    assert meta["height"] == 1042
+    ("full/^!1500,800/0/default.jpg", {"width": 1500, "height": 1042}),
+]
 
+# requests expected to fail with `400 Bad Request`
+BAD_CASES = [
+    # region=Invalid
+    "yo/max/0/default.jpg",
+    "pct:105,100,100,100/max/0/default.jpg",
+    "0,1000,100,100/max/0/default.jpg",
+    # rotation=invalid
+    "full/max/!900/default.jpg",
+    # size: pct invalid
+    "full/pct:-50/0/default.jpg",
+    "full/^pct:-50/0/default.jpg",
+    # do not allow upscale without ^
+    "full/pct:150/0/default.jpg",
+    "full/1500,/0/default.jpg",
+    "full/,1042/0/default.jpg",
+    "full/1500,1000/0/default.jpg",
+    "full/!1500,800/0/default.jpg",
     # size: invalid
-    response = app.get(f"/iiif/{identifier}/full/^!0,0/0/default.jpg")
-    assert response.status_code == 400
+    "full/^!0,0/0/default.jpg",
+    "full/0,0/0/default.jpg",
+    "full/^0,0/0/default.jpg",
+    "full/0,/0/default.jpg",
+    "full/^0,/0/default.jpg",
+    "full/^,0/0/default.jpg",
+    "full/,0/0/default.jpg",
+    # malformed values
+    "a,b,c,d/max/0/default.jpg",
+    "pct:10,10,10/max/0/default.jpg",
+    "full/!750,/0/default.jpg",
+    "full/^,/0/default.jpg",
+    "full/pct:abc/0/default.jpg",
+]
+
+MEDIA_TYPES = {"jpg": "image/jpg", "png": "image/png"}
+
+
+@pytest.mark.parametrize("suffix,expected", IMAGE_CASES)
+def test_iiif_image_endpoint(app, suffix, expected):
+    """Test image endpoints."""
+    response = app.get(f"/iiif/{boston_identifier}/{suffix}")
+    ext = suffix.rsplit(".", 1)[-1]
+    assert_img(response, MEDIA_TYPES[ext], **expected)
 
-    response = app.get(f"/iiif/{identifier}/full/0,0/0/default.jpg")
-    assert response.status_code == 400
 
-    response = app.get(f"/iiif/{identifier}/full/^0,0/0/default.jpg")
+@pytest.mark.parametrize("suffix", BAD_CASES)
+def test_iiif_image_rejects(app, suffix):
+    """Test invalid image requests."""
+    response = app.get(f"/iiif/{boston_identifier}/{suffix}")
     assert response.status_code == 400
 
-    response = app.get(f"/iiif/{identifier}/full/0,/0/default.jpg")
-    assert response.status_code == 400
 
-    response = app.get(f"/iiif/{identifier}/full/^0,/0/default.jpg")
-    assert response.status_code == 400
+def test_iiif_image_square(app):
+    """Test image endpoint with region=square."""
+    response = app.get(f"/iiif/{boston_identifier}/square/max/0/default.jpg")
+    meta = assert_img(response, "image/jpg")
+    assert meta["width"] == meta["height"]
 
-    response = app.get(f"/iiif/{identifier}/full/^,0/0/default.jpg")
-    assert response.status_code == 400
 
-    response = app.get(f"/iiif/{identifier}/full/,0/0/default.jpg")
-    assert response.status_code == 400
+@pytest.mark.asyncio
+async def test_iiif_image_endpoint_concurrent(async_client):
+    """Test concurrent image requests."""
+    responses = await asyncio.gather(
+        *[
+            async_client.get(f"/iiif/{boston_identifier}/{suffix}")
+            for suffix, _ in IMAGE_CASES
+        ]
+    )
+
+    for (suffix, expected), response in zip(IMAGE_CASES, responses):
+        ext = suffix.rsplit(".", 1)[-1]
+        assert_img(response, MEDIA_TYPES[ext], **expected)
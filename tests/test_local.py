@@ -1,32 +1,55 @@
 """test Local Tiler Factory endpoints."""
 
 import os
+from io import BytesIO
 
-from .conftest import parse_img
+import numpy
+
+from .conftest import assert_img
 
 PREFIX = os.path.join(os.path.dirname(__file__), "fixtures")
 
-boston_jpeg = os.path.join(PREFIX, "boston.jpg")
 cog_gcps = os.path.join(PREFIX, "cog_gcps.tif")
 
+BOSTON_TILEJSON = {
+    "tilejson": "2.2.0",
+    "version": "1.0.0",
+    "scheme": "xyz",
+    "minzoom": 0,
+    "maxzoom": 5,
+    "bounds": [0.0, 5352.0, 7696.0, 0.0],
+    "center": [3848.0, 2676.0, 0],
+}
+
+COG_GCPS_TILEJSON = {
+    "tilejson": "2.2.0",
+    "version": "1.0.0",
+    "scheme": "xyz",
+    "minzoom": 0,
+    "maxzoom": 2,
+    "bounds": [0.0, 837.0, 1280.0, 0.0],
+    "center": [640.0, 418.5, 0],
+}
+
+COG_GCPS_TILEJSON_OPTIONS = {
+    "tilejson": "2.2.0",
+    "version": "1.0.0",
+    "scheme": "xyz",
+    "minzoom": 2,
+    "maxzoom": 4,
+    "bounds": [0.0, 837.0, 1280.0, 0.0],
+    "center": [640.0, 418.5, 2],
+}
+
 
-def test_tilejson(app):
+def test_tilejson(app, boston_mem):
     """test tilejson endpoint."""
-    response = app.get("/image/tilejson.json", params={"url": boston_jpeg})
+    response = app.get("/image/tilejson.json", params={"url": boston_mem})
     assert response.status_code == 200
     assert response.headers["content-type"] == "application/json"
     body = response.json()
     tiles = body.pop("tiles")
-    expected = {
-        "tilejson": "2.2.0",
-        "version": "1.0.0",
-        "scheme": "xyz",
-        "minzoom": 0,
-        "maxzoom": 5,
-        "bounds": [0.0, 5352.0, 7696.0, 0.0],
-        "center": [3848.0, 2676.0, 0],
-    }
-    assert body == expected
+    assert body == BOSTON_TILEJSON
     assert tiles[0].startswith("http://testserver/image/tiles/{z}/{x}/{y}?")
 
     response = app.get("/image/tilejson.json", params={"url": cog_gcps})
@@ -34,16 +57,7 @@ def test_tilejson(app):
     assert response.headers["content-type"] == "application/json"
     body = response.json()
     tiles = body.pop("tiles")
-    expected = {
-        "tilejson": "2.2.0",
-        "version": "1.0.0",
-        "scheme": "xyz",
-        "minzoom": 0,
-        "maxzoom": 2,
-        "bounds": [0.0, 837.0, 1280.0, 0.0],
-        "center": [640.0, 418.5, 0],
-    }
-    assert body == expected
+    assert body == COG_GCPS_TILEJSON
     assert tiles[0].startswith("http://testserver/image/tiles/{z}/{x}/{y}?")
 
     response = app.get(
@@ -61,34 +75,45 @@ def test_tilejson(app):
     assert response.headers["content-type"] == "application/json"
     body = response.json()
     tiles = body.pop("tiles")
-    expected = {
-        "tilejson": "2.2.0",
-        "version": "1.0.0",
-        "scheme": "xyz",
-        "minzoom": 2,
-        "maxzoom": 4,
-        "bounds": [0.0, 837.0, 1280.0, 0.0],
-        "center": [640.0, 418.5, 2],
-    }
-    assert body == expected
+    assert body == COG_GCPS_TILEJSON_OPTIONS
     assert tiles[0].startswith("http://testserver/image/tiles/{z}/{x}/{y}@2x.png?")
     assert "rescale=0%2C700" in tiles[0]
 
 
-def test_tiles(app):
+def test_tiles(app, boston_mem):
     """test local tiles endpoint."""
-    response = app.get("/image/tiles/0/0/0", params={"url": boston_jpeg})
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/png"
-    meta = parse_img(response.content)
-    assert meta["width"] == 256
-    assert meta["height"] == 256
+    response = app.get("/image/tiles/0/0/0", params={"url": boston_mem})
+    assert_img(response, "image/png", width=256, height=256)
 
     response = app.get(
         "/image/tiles/0/0/0@2x.jpg", params={"url": cog_gcps, "rescale": "0,700"}
     )
-    assert response.status_code == 200
-    assert response.headers["content-type"] == "image/jpg"
-    meta = parse_img(response.content)
-    assert meta["width"] == 512
-    assert meta["height"] == 512
+    assert_img(response, "image/jpg", width=512, height=512)
+
+    for _ in range(2):
+        response = app.get(
+            "/image/tiles/0/0/0.png",
+            params={"url": boston_mem, "bidx": 1, "colormap_name": "viridis"},
+        )
+        assert_img(response, "image/png", width=256, height=256, count=4)
+
+    response = app.get(
+        "/image/tiles/0/0/0.png",
+        params={"url": boston_mem, "bidx": 1, "colormap": "{'1': 'red'"},
+    )
+    assert response.status_code == 400
+
+
+def test_tiles_mask_band(app, boston_mem):
+    """Data formats always include the mask band, display formats only when needed."""
+    # 0/0/0 is partially outside the image, 5/10/10 is fully valid
+    for tile, png_count in [("0/0/0", 4), ("5/10/10", 3)]:
+        response = app.get(f"/image/tiles/{tile}.npy", params={"url": boston_mem})
+        assert response.status_code == 200
+        assert numpy.load(BytesIO(response.content)).shape == (4, 256, 256)
+
+        response = app.get(f"/image/tiles/{tile}.tif", params={"url": boston_mem})
+        assert_img(response, "image/tiff; application=geotiff", count=4)
+
+        response = app.get(f"/image/tiles/{tile}.png", params={"url": boston_mem})
+        assert_img(response, "image/png", count=png_count)
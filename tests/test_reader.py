@@ -5,8 +5,10 @@ import os
 from typing import List
 
 import numpy
+import pytest
 import rasterio
 from rasterio.control import GroundControlPoint
+from rasterio.errors import RasterioIOError
 
 from titiler.image.reader import Reader
 
@@ -32,8 +34,9 @@ def get_gcps(path: str) -> List[GroundControlPoint]:
                 f["properties"]["resourceCoords"][1],  # row = y
                 f["properties"]["resourceCoords"][0],  # col = x
                 *f["geometry"]["coordinates"],  # lon, lat, z
+                id=str(idx),
             )
-            for f in geojson["features"]
+            for idx, f in enumerate(geojson["features"])
         ]
 
 
@@ -120,3 +123,25 @@ def test_reader_cutline():
 
     with numpy.testing.assert_raises(AssertionError):
         numpy.testing.assert_array_equal(im_cut.array.data, im.array.data)
+
+
+def test_reader_max_workers():
+    """Multi-threaded reads should return the same data."""
+    with Reader(cog_no_gcps, gcps=get_gcps(cog_geojson)) as src:
+        img = src.preview(indexes=1)
+
+    with Reader(cog_no_gcps, gcps=get_gcps(cog_geojson), max_workers=4) as src:
+        assert rasterio.env.getenv()["GDAL_NUM_THREADS"] == 4
+        img_threads = src.preview(indexes=1)
+
+    numpy.testing.assert_array_equal(img.array, img_threads.array)
+
+
+def test_reader_max_workers_open_error():
+    """The GDAL Env should be exited when the dataset can't be opened."""
+    with pytest.raises(RasterioIOError):
+        Reader("/nonexistent.tif", max_workers=4)
+
+    assert not rasterio.env.hasenv() or (
+        "GDAL_NUM_THREADS" not in rasterio.env.getenv()
+    )
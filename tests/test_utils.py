@@ -1,19 +1,55 @@
 """Test titiler-image utils."""
 
 import os
+import time
 
 import numpy
 import pytest
 from fastapi import HTTPException
+from rasterio.io import MemoryFile
 from rio_tiler.io import ImageReader
+from rio_tiler.models import ImageData
 
-from titiler.image.utils import image_to_bitonal, image_to_grayscale, rotate
+from titiler.image import utils
+from titiler.image.utils import (
+    image_to_bitonal,
+    image_to_grayscale,
+    is_fully_valid,
+    render_image,
+    rotate,
+)
 
 PREFIX = os.path.join(os.path.dirname(__file__), "fixtures")
 boston_jpeg = os.path.join(PREFIX, "boston_small.jpg")
 
 
-def test_rotate():
+@pytest.fixture(params=["opencv", "rasterio"])
+def rotate_backend(request, monkeypatch):
+    """Run rotation with OpenCV or with rasterio's reproject."""
+    calls = []
+    if request.param == "rasterio":
+        monkeypatch.setattr(utils, "cv2", None)
+
+    elif utils.cv2 is None:
+        pytest.skip("OpenCV is not installed")
+
+    else:
+        warp_cv2 = utils._warp_cv2
+
+        def _spy(*args, **kwargs):
+            calls.append(args)
+            return warp_cv2(*args, **kwargs)
+
+        monkeypatch.setattr(utils, "_warp_cv2", _spy)
+
+    yield request.param
+
+    # Make sure OpenCV was actually used for the non-lattice rotations
+    if request.param == "opencv":
+        assert calls
+
+
+def test_rotate(rotate_backend):
     """test rotation."""
     with ImageReader(boston_jpeg) as src:
         # read part of the image with mask area
@@ -24,6 +60,7 @@ def test_rotate():
 
         img0 = rotate(img, 0, expand=True)
         numpy.testing.assert_array_equal(img.data, img0.data)
+        assert rotate(img, 360) is img
 
         imgm = rotate(img, 0, mirrored=True)
         with numpy.testing.assert_raises(AssertionError):
@@ -34,6 +71,7 @@ def test_rotate():
             numpy.testing.assert_array_equal(img180.data, img.data)
 
         assert img.data[0, 0, 100] == img180.data[0, 99, 99]
+        numpy.testing.assert_array_equal(img180.data, img.data[:, ::-1, ::-1])
         assert not img180.array.mask[0, 0, 0]  # Not Masked
         assert img180.array.mask[0, 0, 100]  # Masked
 
@@ -55,6 +93,15 @@ def test_rotate():
         assert not img125.array.mask[0, 150, 50]  # Not Masked
 
 
+@pytest.mark.parametrize("mirrored", [False, True])
+def test_rotate_mask_within_data(rotate_backend, mirrored):
+    """Valid pixels of a rotated image should all come from the input data."""
+    img = ImageData(numpy.ma.MaskedArray(numpy.ones((1, 333, 517), dtype="uint8")))
+    for angle in range(1, 360, 5):
+        rotated = rotate(img, angle, expand=True, mirrored=mirrored)
+        assert (rotated.array.data[~rotated.array.mask] == 1).all()
+
+
 def test_gray():
     """test to_grayscale."""
     with ImageReader(boston_jpeg) as src:
@@ -66,6 +113,10 @@ def test_gray():
         assert grey.array.shape == (1, 695, 1000)
         assert grey.array.dtype == "uint8"
 
+        r, g, b = img.data.astype("float64")
+        luma = r * 0.299 + g * 0.587 + b * 0.114
+        numpy.testing.assert_allclose(grey.data[0], luma.astype("uint8"), atol=1)
+
         img = src.preview(indexes=1)
         assert img.array.shape == (1, 695, 1000)
         grey = image_to_grayscale(img)
@@ -87,3 +138,84 @@ def test_bitonal():
         assert grey.array.shape == (1, 695, 1000)
         assert grey.array.dtype == "uint8"
         assert numpy.unique(grey.array).tolist() == [0, 255]
+
+        # mask is preserved
+        img = src.part((-100, 100, 100, 0))
+        bitonal = image_to_bitonal(img)
+        assert bitonal.array.mask[0, 0, 0]  # Masked
+        assert not bitonal.array.mask[0, 0, 100]  # Not Masked
+
+
+def test_ttl_cache(monkeypatch):
+    """Should cache results until they expire."""
+    calls = []
+
+    @utils.ttl_cache(maxsize=2, ttl=10)
+    def double(x):
+        calls.append(x)
+        return x * 2
+
+    assert double(1) == 2
+    assert double(1) == 2
+    assert calls == [1]
+
+    double(2)
+    double(3)  # evicts the oldest entry
+    assert double(1) == 2
+    assert calls == [1, 2, 3, 1]
+
+    now = time.monotonic()
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now + 11)
+    assert double(1) == 2
+    assert calls == [1, 2, 3, 1, 1]
+
+
+@pytest.mark.parametrize(
+    "a,b",
+    [(10, 4), (14, 4), (7, 2), (9, 2), (1000, 3), (2000, 3), (5, 7), (0, 9)],
+)
+def test_round_div(a, b):
+    """Integer division should round like the builtin round()."""
+    assert utils._round_div(a, b) == round(a / b)
+
+
+@pytest.mark.parametrize("opencv", [True, False])
+def test_render_image(opencv, monkeypatch):
+    """Encode JPEG with OpenCV or GDAL."""
+    if not opencv:
+        monkeypatch.setattr(utils, "cv2", None)
+
+    with ImageReader(boston_jpeg) as src:
+        img = src.read()
+
+    for im in [img, image_to_grayscale(img)]:
+        content = render_image(im, img_format="JPEG", quality=85)
+        with MemoryFile(content) as mem:
+            with mem.open() as dst:
+                assert dst.driver == "JPEG"
+                assert dst.count == im.count
+                assert (dst.width, dst.height) == (im.width, im.height)
+
+                # Same band order as the input
+                numpy.testing.assert_allclose(
+                    dst.read().mean(axis=(1, 2)), im.data.mean(axis=(1, 2)), atol=2
+                )
+
+
+def test_is_fully_valid():
+    """Should match `ImageData.mask.all()`."""
+    with ImageReader(boston_jpeg) as src:
+        img = src.read()
+        assert is_fully_valid(img)
+        assert is_fully_valid(img) == img.mask.all()
+
+        img = src.part((-100, 100, 100, 0))
+        assert not is_fully_valid(img)
+        assert is_fully_valid(img) == img.mask.all()
+
+        # only one band masked: pixel still valid
+        img = src.read()
+        img.array.mask = numpy.zeros(img.array.shape, dtype="bool")
+        img.array.mask[0, 0, 0] = True
+        assert is_fully_valid(img)
+        assert is_fully_valid(img) == img.mask.all()
@@ -1,18 +1,54 @@
 """titiler-image dependencies."""
 
+import functools
 import json
+import mmap
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type, Union
 
-import httpx
-from cachetools import TTLCache, cached
+import anyio
 from fastapi import HTTPException, Query
 from geojson_pydantic import MultiPolygon, Polygon
 from rasterio.control import GroundControlPoint
-from rio_tiler.types import RIOResampling
+from rio_tiler.types import ColorMapType, RIOResampling
+from starlette.concurrency import run_in_threadpool
 from typing_extensions import Annotated
 
+from titiler.core.dependencies import ColorMapName
+from titiler.core.dependencies import ColorMapParams as _ColorMapParams
 from titiler.core.dependencies import DefaultDependency
+from titiler.image.utils import ttl_cache
+
+try:
+    import orjson
+except ImportError:  # pragma: nocover
+    orjson = None  # type: ignore
+
+if TYPE_CHECKING:
+    import httpx
+
+# Supported Cutline GeoJSON geometry types
+CUTLINE_GEOMETRIES: Dict[str, Type[Union[Polygon, MultiPolygon]]] = {
+    "Polygon": Polygon,
+    "MultiPolygon": MultiPolygon,
+}
+
+
+# Colormaps are loaded (from .npy files) or parsed (from JSON) on every call
+_cached_colormap = functools.lru_cache(maxsize=256)(_ColorMapParams)
+
+
+def ColorMapParams(
+    colormap_name: Annotated[
+        Optional[ColorMapName],
+        Query(description="Colormap name"),
+    ] = None,
+    colormap: Annotated[
+        Optional[str], Query(description="JSON encoded custom Colormap")
+    ] = None,
+) -> Optional[ColorMapType]:
+    """Colormap Dependency (cached)."""
+    return _cached_colormap(colormap_name, colormap)
 
 
 @dataclass
@@ -35,55 +71,108 @@ class DatasetParams(DefaultDependency):
     ] = "nearest"
 
 
-@cached(TTLCache(maxsize=512, ttl=3600))
-def get_gcps(gcps_file: str) -> List[GroundControlPoint]:
-    """Fetch and parse GCPS file."""
-    if gcps_file.startswith("http"):
-        body = httpx.get(gcps_file).json()
+@functools.lru_cache(maxsize=1)
+def _http_client() -> "httpx.AsyncClient":
+    """Shared HTTP client (created on first use), reusing connections across requests."""
+    import httpx
 
-    else:
-        with open(gcps_file, "r") as f:
-            body = json.load(f)
+    return httpx.AsyncClient()
 
-    return [
-        # GroundControlPoint(row, col, x, y, z)
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (if it was created)."""
+    if _http_client.cache_info().currsize:
+        await _http_client().aclose()
+        _http_client.cache_clear()
+
+
+def _json_loads(content: bytes) -> Any:
+    """Parse JSON document (using orjson if available)."""
+    if orjson is not None:
+        return orjson.loads(content)
+
+    return json.loads(content)
+
+
+def _json_load_file(path: str) -> Any:
+    """Parse local JSON file (memory-mapped when using orjson)."""
+    with open(path, "rb") as f:
+        if orjson is None:
+            return json.load(f)
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as buffer:
+                return orjson.loads(buffer)
+
+
+async def _fetch_json(path: str) -> Any:
+    """Fetch (remote) or read (local) a JSON document, without blocking the event loop."""
+    if path.startswith("http"):
+        content = (await _http_client().get(path)).content
+
+        return await run_in_threadpool(_json_loads, content)
+
+    return await run_in_threadpool(_json_load_file, path)
+
+
+def _gcps_from_geojson(body: Dict) -> List[GroundControlPoint]:
+    """Create GCPS from a GeoJSON FeatureCollection."""
+    gcps = []
+    for idx, feat in enumerate(body["features"]):
         # https://github.com/allmaps/iiif-api/blob/georef/source/extension/georef/index.md#35-the-resourcecoords-property
-        GroundControlPoint(
-            f["properties"]["resourceCoords"][1],
-            f["properties"]["resourceCoords"][0],
-            *f["geometry"]["coordinates"],  # x, y, z
-            id=f.get("id"),
+        col, row = feat["properties"]["resourceCoords"]
+
+        # NOTE: we use the feature index as default ID because
+        # rasterio would otherwise generate (slow) UUIDs
+        gcps.append(
+            GroundControlPoint(
+                row,
+                col,
+                *feat["geometry"]["coordinates"],  # x, y, z
+                id=str(feat.get("id", idx)),
+            )
         )
-        for f in body["features"]
-    ]
-
 
-@cached(TTLCache(maxsize=512, ttl=3600))
-def get_cutline(cutline_file: str) -> str:
-    """Fetch and parse Cutline file."""
-    if cutline_file.startswith("http"):
-        body = httpx.get(cutline_file).json()
+    return gcps
 
-    else:
-        with open(cutline_file, "r") as f:
-            body = json.load(f)
 
+def _cutline_from_geojson(body: Dict) -> str:
+    """Return the WKT of a GeoJSON (Multi)Polygon Feature or Geometry."""
     # We assume the geojson is a Feature (not a Feature Collectionw)
     if "geometry" in body:
         body = body["geometry"]
 
     geom_type = body["type"]
-    if geom_type == "Polygon":
-        return Polygon.parse_obj(body).wkt
-
-    elif geom_type == "MultiPolygon":
-        return MultiPolygon.parse_obj(body).wkt
-
-    else:
+    if geom_type not in CUTLINE_GEOMETRIES:
         raise HTTPException(
             status_code=400, detail=f"Invalid GeoJSON type: {geom_type}."
         )
 
+    return CUTLINE_GEOMETRIES[geom_type].model_validate(body).wkt
+
+
+@ttl_cache(maxsize=512, ttl=3600)
+async def get_gcps(gcps_file: str) -> List[GroundControlPoint]:
+    """Fetch and parse GCPS file."""
+    body = await _fetch_json(gcps_file)
+    return await run_in_threadpool(_gcps_from_geojson, body)
+
+
+@ttl_cache(maxsize=512, ttl=3600)
+async def get_cutline(cutline_file: str) -> str:
+    """Fetch and parse Cutline file."""
+    body = await _fetch_json(cutline_file)
+    return await run_in_threadpool(_cutline_from_geojson, body)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_gcps(gcps: Tuple[str, ...]) -> List[GroundControlPoint]:
+    """Parse GCPS in form of `row (y), col (x), lon, lat, alt`."""
+    return [
+        GroundControlPoint(*map(float, gcp.split(",")), id=str(idx))
+        for idx, gcp in enumerate(gcps)
+    ]
+
 
 @dataclass
 class GCPSParams(DefaultDependency):
@@ -127,15 +216,16 @@ class GCPSParams(DefaultDependency):
         """Initialize GCPSParams and Cutline
 
         Note: We only want `gcps` or `cutline` to be forwarded to the reader so we use a custom `__init__` method used by FastAPI to parse the QueryParams.
+
+        Files are only fetched when no inline `gcps`/`cutline` is given. FastAPI runs
+        class dependencies in its threadpool, where `anyio.from_thread.run` can call
+        the (async) loaders on the event loop.
         """
         if gcps:
-            self.gcps: List[GroundControlPoint] = [  # type: ignore
-                # WARNING: gpcs should be in form of `row (y), col (x), lon, lat, alt`
-                GroundControlPoint(*list(map(float, gcps.split(","))))
-                for gcps in gcps
-            ]
+            # WARNING: gpcs should be in form of `row (y), col (x), lon, lat, alt`
+            self.gcps = _parse_gcps(tuple(gcps))
         elif gcps_file:
-            self.gcps = get_gcps(gcps_file)
+            self.gcps = anyio.from_thread.run(get_gcps, gcps_file)
 
         if gcps_order is not None:
             self.gcps_order = gcps_order
@@ -149,4 +239,4 @@ class GCPSParams(DefaultDependency):
             self.cutline = cutline
 
         elif cutline_file:
-            self.cutline = get_cutline(cutline_file)
+            self.cutline = anyio.from_thread.run(get_cutline, cutline_file)
@@ -1,31 +1,42 @@
 """titiler.image factories."""
 
 import abc
+import copy
+import functools
 import urllib.parse
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Literal, Optional, Tuple, Type
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 import jinja2
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, params
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Path, Query, params
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.models import Dependant
 from fastapi.dependencies.utils import get_parameterless_sub_dependant
+from fastapi.routing import APIRoute
 from pydantic import conint
-from rasterio import windows
 from rio_tiler.io import BaseReader, ImageReader
 from rio_tiler.models import Info
 from starlette.requests import Request
-from starlette.responses import (
-    HTMLResponse,
-    RedirectResponse,
-    Response,
-    StreamingResponse,
-)
+from starlette.responses import HTMLResponse, RedirectResponse, Response
 from starlette.routing import Match, compile_path, replace_params
 from starlette.templating import Jinja2Templates
 from typing_extensions import Annotated
 
 from titiler.core.dependencies import (
     BidxExprParams,
-    ColorMapParams,
     DefaultDependency,
     HistogramParams,
     ImageParams,
@@ -38,23 +49,112 @@ from titiler.core.models.responses import Statistics
 from titiler.core.resources.enums import ImageType, MediaType
 from titiler.core.resources.responses import JSONResponse
 from titiler.core.routing import EndpointScope
-from titiler.image.dependencies import DatasetParams, GCPSParams
+from titiler.image.dependencies import ColorMapParams, DatasetParams, GCPSParams
 from titiler.image.models import iiifInfo
 from titiler.image.reader import Reader
 from titiler.image.resources.enums import IIIFImageFormat
 from titiler.image.settings import iiif_settings
 from titiler.image.utils import (
     _get_sizes,
-    _percent,
+    _parse_region,
+    _parse_size,
     accept_media_type,
     image_to_bitonal,
     image_to_grayscale,
+    is_fully_valid,
+    render_image,
     rotate,
+    ttl_cache,
 )
 
+# Router prefixes are fixed, so their compiled form can be reused
+_compile_path = functools.lru_cache(maxsize=32)(compile_path)
+
+# Map clients request the same TileJSON (and query string) over and over
+_urlencode = functools.lru_cache(maxsize=1024)(urllib.parse.urlencode)
+
+IIIF_LD_JSON_MEDIATYPE = (
+    'application/ld+json;profile="http://iiif.io/api/image/3/context.json"'
+)
+
+
+def _format_dispatch(*enums: Type[Enum]) -> Dict[Enum, Tuple[str, Dict, str]]:
+    """Map output formats to their (driver, profile, mediatype)."""
+    dispatch: Dict[Enum, Tuple[str, Dict, str]] = {}
+    for enum in enums:
+        for fmt in enum:
+            try:
+                dispatch[fmt] = (fmt.driver, fmt.profile, fmt.mediatype)  # type: ignore
+            except KeyError:  # format without a GDAL driver (e.g. gif)
+                continue
+
+    return dispatch
+
+
+_FORMAT_DISPATCH = _format_dispatch(ImageType, IIIFImageFormat)
+
+# Most common IIIF rotation values (with and without mirroring)
+IIIF_ROTATIONS = {
+    f"{prefix}{angle}": float(angle)
+    for prefix in ("", "!")
+    for angle in (0, 90, 180, 270)
+}
+
+# TileJSON query parameters which should not be forwarded to the tile URL
+TILEJSON_EXCLUDED_QS = frozenset({"tile_format", "tile_scale", "minzoom", "maxzoom"})
+
+
+class DatasetMeta(NamedTuple):
+    """Image metadata used by the TileJSON and IIIF info endpoints."""
+
+    width: int
+    height: int
+    geographic_bounds: Tuple[float, float, float, float]
+    minzoom: int
+    maxzoom: int
+
+
+@ttl_cache(maxsize=256, ttl=60)
+def _dataset_meta(src_path: str) -> DatasetMeta:
+    """Open the image (once per minute) and return its metadata."""
+    with ImageReader(src_path) as dst:
+        return DatasetMeta(
+            width=dst.dataset.width,
+            height=dst.dataset.height,
+            geographic_bounds=dst.geographic_bounds,
+            minzoom=dst.minzoom,
+            maxzoom=dst.maxzoom,
+        )
+
+
+@ttl_cache(maxsize=256, ttl=60)
+def _dataset_info(src_path: str) -> Info:
+    """Open the image (once per minute) and return its info."""
+    with ImageReader(src_path) as dst:
+        return dst.info()
+
+
+@functools.lru_cache(maxsize=1024)
+def _iiif_info_json(url_path: str, width: int, height: int) -> bytes:
+    """Serialize (once) the IIIF info document."""
+    # TODO: If overviews:
+    # Set Sizes
+    # Set Tiles (using min/max zooms)
+    info = iiifInfo(id=url_path, width=width, height=height)
+    return info.model_dump_json(by_alias=True, exclude_none=True).encode()
+
+
+@functools.lru_cache(maxsize=128)
+def _parameterless_sub_dependant(depends: params.Depends, path: str) -> Dependant:
+    """Analyse (once) a dependency added to a route."""
+    return get_parameterless_sub_dependant(depends=depends, path=path)
+
+
 DEFAULT_TEMPLATES = Jinja2Templates(
     directory="",
     loader=jinja2.ChoiceLoader([jinja2.PackageLoader(__package__, "templates")]),
+    # Packaged templates do not change at runtime: skip the per-render mtime check
+    auto_reload=False,
 )  # type:ignore
 
 
@@ -87,6 +187,9 @@ class BaseFactory(metaclass=abc.ABCMeta):
         """Post Init: register route and configure specific options."""
         self.register_routes()
 
+        # Cache route path lookups (e.g the TileJSON's tile URL template)
+        self._url_path_for = functools.lru_cache(maxsize=256)(self.router.url_path_for)
+
         for scopes, dependencies in self.route_dependencies:
             self.add_route_dependencies(scopes=scopes, dependencies=dependencies)
 
@@ -97,14 +200,14 @@ class BaseFactory(metaclass=abc.ABCMeta):
 
     def url_for(self, request: Request, name: str, **path_params: Any) -> str:
         """Return full url (with prefix) for a specific endpoint."""
-        url_path = self.router.url_path_for(name, **path_params)
+        url_path = self._url_path_for(name, **path_params)
         base_url = str(request.base_url)
         if self.router_prefix:
             prefix = self.router_prefix.lstrip("/")
             # If we have prefix with custom path param we check and replace them with
             # the path params provided
             if "{" in prefix:
-                _, path_format, param_convertors = compile_path(prefix)
+                _, path_format, param_convertors = _compile_path(prefix)
                 prefix, _ = replace_params(
                     path_format, param_convertors, request.path_params
                 )
@@ -112,6 +215,47 @@ class BaseFactory(metaclass=abc.ABCMeta):
 
         return str(url_path.make_absolute_url(base_url=base_url))
 
+    def mount_to(
+        self,
+        app: Union[FastAPI, APIRouter],
+        prefix: str = "",
+        tags: Optional[List[str]] = None,
+    ):
+        """Add the factory's routes to an application (or router).
+
+        Lightweight alternative to `app.include_router(factory.router, prefix=..., tags=...)`:
+        routes are shallow copies with an updated path instead of being re-created.
+
+        Note: Routes are not re-created, so path parameters in the prefix (e.g `/{name}`)
+        would never be passed to the endpoints. Use `app.include_router` for those.
+
+        """
+        if "{" in prefix:
+            raise ValueError(
+                f"Prefix with path parameters ({prefix}) is not supported by `mount_to`, use `app.include_router` instead."
+            )
+
+        for route in self.router.routes:
+            new_route = copy.copy(cast(APIRoute, route))
+            new_route.path = prefix + new_route.path
+            (
+                new_route.path_regex,
+                new_route.path_format,
+                new_route.param_convertors,
+            ) = compile_path(new_route.path)
+            new_route.tags = [*(tags or []), *new_route.tags]
+
+            generate_unique_id: Callable[[APIRoute], str] = (
+                new_route.generate_unique_id_function.value
+                if isinstance(new_route.generate_unique_id_function, DefaultPlaceholder)
+                else new_route.generate_unique_id_function
+            )
+            new_route.unique_id = new_route.operation_id or generate_unique_id(
+                new_route
+            )
+
+            app.routes.append(new_route)
+
     def add_route_dependencies(
         self,
         *,
@@ -123,9 +267,10 @@ class BaseFactory(metaclass=abc.ABCMeta):
         Allows a developer to add dependencies to a route after the route has been defined.
 
         """
+        http_scopes = [{"type": "http", **scope} for scope in scopes]
         for route in self.router.routes:
-            for scope in scopes:
-                match, _ = route.matches({"type": "http", **scope})
+            for scope in http_scopes:
+                match, _ = route.matches(scope)
                 if match != Match.FULL:
                     continue
 
@@ -134,8 +279,8 @@ class BaseFactory(metaclass=abc.ABCMeta):
                 for depends in dependencies[::-1]:
                     route.dependant.dependencies.insert(  # type: ignore
                         0,
-                        get_parameterless_sub_dependant(
-                            depends=depends, path=route.path_format  # type: ignore
+                        _parameterless_sub_dependant(
+                            depends, route.path_format  # type: ignore
                         ),
                     )
 
@@ -170,8 +315,7 @@ class MetadataFactory(BaseFactory):
             ],
         ):
             """Return Image metadata."""
-            with ImageReader(src_path) as dst:
-                return dst.info()
+            return _dataset_info(src_path)
 
         @self.router.get(
             "/statistics",
@@ -291,27 +435,21 @@ class LocalTilerFactory(BaseFactory):
 
             tiles_url = self.url_for(request, "tile", **route_params)
 
-            qs_key_to_remove = [
-                "tile_format",
-                "tile_scale",
-                "minzoom",
-                "maxzoom",
-            ]
-            qs = [
+            qs = tuple(
                 (key, value)
                 for (key, value) in request.query_params._list
-                if key.lower() not in qs_key_to_remove
-            ]
+                if key.lower() not in TILEJSON_EXCLUDED_QS
+            )
             if qs:
-                tiles_url += f"?{urllib.parse.urlencode(qs)}"
-
-            with ImageReader(src_path) as dst:
-                return {
-                    "bounds": dst.geographic_bounds,
-                    "minzoom": minzoom if minzoom is not None else dst.minzoom,
-                    "maxzoom": maxzoom if maxzoom is not None else dst.maxzoom,
-                    "tiles": [tiles_url],
-                }
+                tiles_url += f"?{_urlencode(qs)}"
+
+            meta = _dataset_meta(src_path)
+            return {
+                "bounds": meta.geographic_bounds,
+                "minzoom": minzoom if minzoom is not None else meta.minzoom,
+                "maxzoom": maxzoom if maxzoom is not None else meta.maxzoom,
+                "tiles": [tiles_url],
+            }
 
         @self.router.get("/tiles/{z}/{x}/{y}", **img_endpoint_params)
         @self.router.get("/tiles/{z}/{x}/{y}.{format}", **img_endpoint_params)
@@ -381,15 +519,17 @@ class LocalTilerFactory(BaseFactory):
                 image = image.apply_colormap(cmap)
 
             if not format:
-                format = ImageType.jpeg if image.mask.all() else ImageType.png
-
-            content = image.render(
-                add_mask=add_mask if add_mask is not None else True,
-                img_format=format.driver,
-                **format.profile,
+                format = ImageType.jpeg if is_fully_valid(image) else ImageType.png
+
+            driver, profile, media_type = _FORMAT_DISPATCH[format]
+            content = render_image(
+                image,
+                img_format=driver,
+                add_mask=add_mask,
+                **profile,
             )
 
-            return Response(content, media_type=format.mediatype)
+            return Response(content, media_type=media_type)
 
     def register_viewer(self):
         """Register Viewer route."""
@@ -439,8 +579,8 @@ class LocalTilerFactory(BaseFactory):
         ):
             """Return Simple Image viewer."""
             tilejson_url = self.url_for(request, "tilejson")
-            if request.query_params._list:
-                tilejson_url += f"?{urllib.parse.urlencode(request.query_params._list)}"
+            if query_string := request.scope.get("query_string"):
+                tilejson_url += f"?{query_string.decode('latin-1')}"
 
             return self.templates.TemplateResponse(
                 name="local.html",
@@ -501,24 +641,14 @@ class IIIFFactory(BaseFactory):
                 identifier=urllib.parse.quote_plus(identifier, safe=""),
             )
 
-            identifier = urllib.parse.unquote(identifier)
-            with ImageReader(identifier) as dst:
-                # TODO: If overviews:
-                # Set Sizes
-                # Set Tiles (using min/max zooms)
-                info = iiifInfo(
-                    id=url_path,
-                    width=dst.dataset.width,
-                    height=dst.dataset.height,
-                )
+            meta = _dataset_meta(urllib.parse.unquote(identifier))
 
-                if output_type == "application/ld+json":
-                    return StreamingResponse(
-                        iter((info.model_dump_json(exclude_none=True) + "\n",)),
-                        media_type='application/ld+json;profile="http://iiif.io/api/image/3/context.json"',
-                    )
+            content = _iiif_info_json(url_path, meta.width, meta.height)
+
+            if output_type == "application/ld+json":
+                return Response(content + b"\n", media_type=IIIF_LD_JSON_MEDIATYPE)
 
-            return info
+            return Response(content, media_type=MediaType.json.value)
 
         @self.router.get(
             "/{identifier:path}/{region}/{size}/{rotation}/{quality}.{format}",
@@ -593,237 +723,19 @@ class IIIFFactory(BaseFactory):
                 # REGION
                 # full, square, x,y,w,h, pct:x,y,w,h
                 #################################################################################
-                window = windows.Window(
-                    col_off=0, row_off=0, width=dst_width, height=dst_height
-                )
-                if region == "full":
-                    # The full image is returned, without any cropping.
-                    pass
-
-                elif region == "square":
-                    # The region is defined as an area where the width and height are both equal to the length of the shorter dimension of the full image.
-                    # The region may be positioned anywhere in the longer dimension of the full image at the server’s discretion, and centered is often a reasonable default.
-                    min_size = min(dst_width, dst_height)
-                    x_off = (dst_width - min_size) // 2
-                    y_off = (dst_height - min_size) // 2
-                    window = windows.Window(
-                        col_off=x_off, row_off=y_off, width=min_size, height=min_size
-                    )
-
-                elif region.startswith("pct:"):
-                    # The region to be returned is specified as a sequence of percentages of the full image’s dimensions,
-                    # as reported in the image information document.
-                    # Thus, x represents the number of pixels from the 0 position on the horizontal axis, calculated as a percentage of the reported width.
-                    # w represents the width of the region, also calculated as a percentage of the reported width.
-                    # The same applies to y and h respectively.
-                    x, y, w, h = list(map(float, region.replace("pct:", "").split(",")))
-                    if max(x, y, w, h) > 100 or min(x, y, w, h) < 0:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Invalid Region parameter: {region}.",
-                        )
-
-                    x = round(_percent(dst_width, x))
-                    y = round(_percent(dst_height, y))
-                    w = round(_percent(dst_width, w))
-                    h = round(_percent(dst_height, h))
-
-                    # Service should return an image cropped at the image’s edge, rather than adding empty space.
-                    w = dst_width - x if w + x > dst_width else w
-                    h = dst_height - y if h + y > dst_height else h
-
-                    window = windows.Window(col_off=x, row_off=y, width=w, height=h)
-
-                elif len(region.split(",")) == 4:
-                    # The region of the full image to be returned is specified in terms of absolute pixel values.
-                    # The value of x represents the number of pixels from the 0 position on the horizontal axis.
-                    # The value of y represents the number of pixels from the 0 position on the vertical axis.
-                    # Thus the x,y position 0,0 is the upper left-most pixel of the image. w represents
-                    # the width of the region and h represents the height of the region in pixels.
-                    x, y, w, h = list(map(float, region.split(",")))
-
-                    # Service should return an image cropped at the image’s edge, rather than adding empty space.
-                    w = dst_width - x if w + x > dst_width else w
-                    h = dst_height - y if h + y > dst_height else h
-
-                    try:
-                        window = windows.Window(col_off=x, row_off=y, width=w, height=h)
-                    except ValueError as e:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Invalid Region parameter: {region}.",
-                        ) from e
-
-                else:
-                    raise HTTPException(
-                        status_code=400, detail=f"Invalid Region parameter: {region}."
-                    )
-
-                if (
-                    window.width <= 0
-                    or window.height <= 0
-                    or window.col_off > dst_width
-                    or window.row_off > dst_height
-                ):
-                    raise HTTPException(
-                        status_code=400, detail=f"Invalid Region parameter: {region}."
-                    )
+                window = _parse_region(region, dst_width, dst_height)
 
                 #################################################################################
                 # SIZE
                 # Formats are: w, ,h w,h pct:p !w,h full max ^w, ^,h ^w,h
                 #################################################################################
-                out_width, out_height = window.width, window.height
-                aspect_ratio = out_width / out_height
-
-                if size == "max":
-                    # max: The extracted region is returned at the maximum size available, but will not be upscaled.
-                    # The resulting image will have the pixel dimensions of the extracted region,
-                    # unless it is constrained to a smaller size by maxWidth, maxHeight, or maxArea
-                    pass
-
-                elif size == "^max":
-                    # ^max: The extracted region is scaled to the maximum size permitted by maxWidth, maxHeight, or maxArea.
-                    # If the resulting dimensions are greater than the pixel width and height of the extracted region, the extracted region is upscaled.
-                    if aspect_ratio > 1:
-                        out_width = (
-                            max(out_width, iiif_settings.max_width)
-                            if iiif_settings.max_width
-                            else out_width
-                        )
-                        out_height = round(out_width / aspect_ratio)
-                    else:
-                        out_height = (
-                            max(out_height, iiif_settings.max_height)
-                            if iiif_settings.max_height
-                            else out_height
-                        )
-                        out_width = round(aspect_ratio * out_height)
-
-                elif size.startswith("pct:"):
-                    # pct:n: The width and height of the returned image is scaled to n percent of the width and height of the extracted region.
-                    # The value of n must not be greater than 100.
-                    pct_size = float(size.replace("pct:", ""))
-                    if pct_size > 100 or pct_size <= 0:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Invalid Size parameter: {size} (must be between 0 and 100).",
-                        )
-
-                    out_width = round(_percent(out_width, pct_size))
-                    out_height = round(_percent(out_height, pct_size))
-
-                elif size.startswith("^pct:"):
-                    # ^pct:n: The width and height of the returned image is scaled to n percent of the width and height of the extracted region.
-                    # For values of n greater than 100, the extracted region is upscaled.
-                    pct_size = float(size.replace("^pct:", ""))
-                    if pct_size <= 0:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Invalid Size parameter: {size} (must be greater than 0).",
-                        )
-
-                    out_width = round(_percent(out_width, pct_size))
-                    out_height = round(_percent(out_height, pct_size))
-
-                elif "," in size:
-                    sizes = size.split(",")
-
-                    if size.startswith("^!"):
-                        # ^!w,h	The extracted region is scaled so that the width and height of the returned image are not greater than w and h, while maintaining the aspect ratio.
-                        # The returned image must be as large as possible but not larger than w, h, or server-imposed limits.
-                        max_width, max_height = list(
-                            map(int, size.replace("^!", "").split(","))
-                        )
-                        if aspect_ratio > 1:
-                            out_width = max_width
-                            out_height = round(out_width / aspect_ratio)
-                        else:
-                            out_height = max_height
-                            out_width = round(aspect_ratio * out_height)
-
-                    elif size.startswith("!"):
-                        # !w,h	The extracted region is scaled so that the width and height of the returned image are not greater than w and h, while maintaining the aspect ratio.
-                        # The returned image must be as large as possible but not larger than the extracted region, w or h, or server-imposed limits.
-                        max_width, max_height = list(
-                            map(int, size.replace("!", "").split(","))
-                        )
-
-                        if aspect_ratio > 1:
-                            out_width = max_width
-                            out_height = round(out_width / aspect_ratio)
-                        else:
-                            out_height = max_height
-                            out_width = round(aspect_ratio * out_height)
-
-                        if out_width > window.width or out_height > window.height:
-                            raise HTTPException(
-                                status_code=400,
-                                detail=f"Invalid 'h,w' parameter: {size} (greater than region height {window.width},{window.height}).",
-                            )
-
-                    elif size.startswith("^"):
-                        sizes = size.replace("^", "").split(",")
-
-                        if size.endswith(","):
-                            # ^w,: The extracted region should be scaled so that the width of the returned image is exactly equal to w.
-                            # If w is greater than the pixel width of the extracted region, the extracted region is upscaled.
-                            out_width = int(sizes[0])
-                            out_height = round(out_width / aspect_ratio)
-
-                        elif size.startswith("^,"):
-                            # ^,h: The extracted region should be scaled so that the height of the returned image is exactly equal to h. If h is greater than the pixel height of the extracted region, the extracted region is upscaled.
-                            out_height = int(sizes[1])
-                            out_width = round(aspect_ratio * out_height)
-
-                        elif sizes[0] and sizes[1]:
-                            # ^w,h:	The width and height of the returned image are exactly w and h.
-                            # The aspect ratio of the returned image may be significantly different than the extracted region, resulting in a distorted image.
-                            # If w and/or h are greater than the corresponding pixel dimensions of the extracted region, the extracted region is upscaled.
-                            out_width, out_height = list(map(int, sizes))
-
-                    elif size.endswith(","):
-                        # w,: The extracted region should be scaled so that the width of the returned image is exactly equal to w.
-                        # The value of w must not be greater than the width of the extracted region.
-                        out_width = int(sizes[0])
-                        if out_width > window.width:
-                            raise HTTPException(
-                                status_code=400,
-                                detail=f"Invalid 'w' parameter: {out_width} (greater than region width {window.width}).",
-                            )
-                        out_height = round(out_width / aspect_ratio)
-
-                    elif size.startswith(","):
-                        # ,h: The extracted region should be scaled so that the height of the returned image is exactly equal to h.
-                        # The value of h must not be greater than the height of the extracted region.
-                        out_height = int(sizes[1])
-                        if out_height > window.height:
-                            raise HTTPException(
-                                status_code=400,
-                                detail=f"Invalid 'h' parameter: {out_height} (greater than region height {window.height}).",
-                            )
-                        out_width = round(aspect_ratio * out_height)
-
-                    elif sizes[0] and sizes[1]:
-                        # w,h: The width and height of the returned image are exactly w and h.
-                        # The aspect ratio of the returned image may be significantly different than the extracted region, resulting in a distorted image.
-                        # The values of w and h must not be greater than the corresponding pixel dimensions of the extracted region.
-                        out_width, out_height = list(map(int, sizes))
-                        if out_width > window.width or out_height > window.height:
-                            raise HTTPException(
-                                status_code=400,
-                                detail=f"Invalid 'h,w' parameter: {size} (greater than region height {window.width},{window.height}).",
-                            )
-
-                    else:
-                        raise HTTPException(
-                            status_code=400, detail=f"Invalid Size parameter: {size}."
-                        )
-
-                else:
-                    raise HTTPException(
-                        status_code=400, detail=f"Invalid Size parameter: {size}."
-                    )
+                out_width, out_height = _parse_size(
+                    size,
+                    window.width,
+                    window.height,
+                    max_width=iiif_settings.max_width,
+                    max_height=iiif_settings.max_height,
+                )
 
                 out_width, out_height = _get_sizes(
                     out_width,
@@ -853,7 +765,9 @@ class IIIFFactory(BaseFactory):
             # Formats are: n, !n
             #################################################################################
             try:
-                rot = float(rotation.replace("!", ""))
+                rot = IIIF_ROTATIONS.get(rotation)
+                if rot is None:
+                    rot = float(rotation.replace("!", ""))
                 if rot < 0 or rot > 360:
                     raise ValueError("Invalid rotation value")
 
@@ -886,12 +800,21 @@ class IIIFFactory(BaseFactory):
             if cmap := colormap or dst_colormap:
                 image = image.apply_colormap(cmap)
 
-            content = image.render(
-                add_mask=add_mask if add_mask is not None else True,
-                img_format=format.driver,
-                **format.profile,
+            driver, profile, media_type = _FORMAT_DISPATCH[format]
+            content = render_image(
+                image,
+                img_format=driver,
+                add_mask=add_mask,
+                **profile,
+            )
+            return Response(
+                content,
+                media_type=media_type,
+                headers={
+                    "X-Image-Width": str(image.width),
+                    "X-Image-Height": str(image.height),
+                },
             )
-            return Response(content, media_type=format.mediatype)
 
         @self.router.get(
             "/{identifier:path}",
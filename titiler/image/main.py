@@ -1,5 +1,6 @@
 """TiTiler-Image FastAPI application."""
 import warnings
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
@@ -11,6 +12,7 @@ from starlette_cramjam.middleware import CompressionMiddleware
 from titiler.core.errors import DEFAULT_STATUS_CODES, add_exception_handlers
 from titiler.core.middleware import CacheControlMiddleware
 from titiler.image import __version__ as titiler_image_version
+from titiler.image.dependencies import close_http_client
 from titiler.image.factory import (
     GeoTilerFactory,
     IIIFFactory,
@@ -19,6 +21,14 @@ from titiler.image.factory import (
 )
 from titiler.image.settings import api_settings
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the shared GCPS/Cutline HTTP client on shutdown."""
+    yield
+    await close_http_client()
+
+
 app = FastAPI(
     title=api_settings.name,
     openapi_url="/api",
@@ -33,6 +43,7 @@ app = FastAPI(
     """,
     version=titiler_image_version,
     root_path=api_settings.root_path,
+    lifespan=lifespan,
 )
 
 warnings.filterwarnings("ignore", category=NotGeoreferencedWarning)
@@ -75,13 +86,13 @@ app.add_middleware(
 )
 
 meta = MetadataFactory()
-app.include_router(meta.router, tags=["Metadata"])
+meta.mount_to(app, tags=["Metadata"])
 
 iiif = IIIFFactory(router_prefix="/iiif")
-app.include_router(iiif.router, tags=["IIIF"], prefix="/iiif")
+iiif.mount_to(app, prefix="/iiif", tags=["IIIF"])
 
 image_tiles = LocalTilerFactory(router_prefix="/image")
-app.include_router(image_tiles.router, tags=["Local Tiles"], prefix="/image")
+image_tiles.mount_to(app, prefix="/image", tags=["Local Tiles"])
 
 geo_tiles = GeoTilerFactory(router_prefix="/geo")
 app.include_router(geo_tiles.router, tags=["Geo Tiles"], prefix="/geo")
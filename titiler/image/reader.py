@@ -2,7 +2,7 @@
 
 import warnings
 import xml.etree.ElementTree as ET
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 import attr
 import rasterio
@@ -19,6 +19,8 @@ from rio_tiler.constants import WGS84_CRS
 from rio_tiler.errors import NoOverviewWarning
 from rio_tiler.utils import has_alpha_band
 
+from titiler.image.utils import ttl_cache
+
 
 @attr.s
 class Reader(io.Reader):
@@ -30,17 +32,40 @@ class Reader(io.Reader):
 
     cutline: Optional[str] = attr.ib(default=None)
 
+    # Number of threads GDAL can use to decode/warp blocks (GDAL_NUM_THREADS)
+    max_workers: Optional[Union[int, str]] = attr.ib(default=None)
+
     dataset: Union[DatasetReader, WarpedVRT] = attr.ib(init=False)
 
     def __attrs_post_init__(self):
         """Define _kwargs, open dataset and get info."""
-        dataset = self._ctx_stack.enter_context(rasterio.open(self.input))
+        try:
+            self._open()
+
+        except Exception:
+            # Exit the GDAL Env and close opened datasets: `__exit__` won't be called
+            self._ctx_stack.close()
+            raise
+
+    def _open(self):  # noqa: C901
+        """Open the dataset (and create the VRT if needed)."""
+        if self.max_workers:
+            self._ctx_stack.enter_context(
+                rasterio.Env(GDAL_NUM_THREADS=self.max_workers)
+            )
 
         # when external GCPS we create a VRT
         if self.gcps:
-            vrt_xml = vrt_doc(dataset, gcps=self.gcps, gcps_crs=self.gcps_crs)
+            vrt_xml = _gcps_vrt_doc(
+                self.input,
+                tuple((gcp.id, gcp.row, gcp.col, gcp.x, gcp.y) for gcp in self.gcps),
+                self.gcps_crs,
+            )
             dataset = self._ctx_stack.enter_context(rasterio.open(vrt_xml))
 
+        else:
+            dataset = self._ctx_stack.enter_context(rasterio.open(self.input))
+
         vrt_options = {}
 
         # Options 1: GCPS (internal or external)
@@ -94,6 +119,29 @@ class Reader(io.Reader):
             )
 
 
+@ttl_cache(maxsize=256, ttl=60)
+def _gcps_vrt_doc(
+    input: str,
+    gcps: Tuple[Tuple[str, float, float, float, float], ...],
+    gcps_crs: Optional[CRS] = WGS84_CRS,
+) -> str:
+    """Make (and cache) the VRT document for a dataset with external GCPS.
+
+    Note: The VRT embeds the source size, data types, nodata, block shapes and tags
+    but is cached by path, so it can describe a replaced file for up to 60 seconds
+    (the same as the metadata caches).
+
+    """
+    with rasterio.open(input) as src_dataset:
+        return vrt_doc(
+            src_dataset,
+            gcps=[
+                GroundControlPoint(row, col, x, y, id=id) for id, row, col, x, y in gcps
+            ],
+            gcps_crs=gcps_crs,
+        )
+
+
 def vrt_doc(  # noqa: C901
     src_dataset,
     gcps: Optional[List[GroundControlPoint]] = None,
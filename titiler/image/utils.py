@@ -1,17 +1,90 @@
 """Titiler.image utility functions."""
 
+import functools
+import inspect
 import math
-from typing import List, Optional, Tuple
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 import numpy
 from affine import Affine
 from fastapi import HTTPException
+from rasterio import windows
 from rasterio.warp import reproject
 from rio_tiler.models import ImageData
 
+try:
+    import cv2
+except ImportError:  # pragma: nocover
+    cv2 = None  # type: ignore
 
-def _percent(x: float, y: float) -> float:
-    return (x / 100) * y
+# Data types supported by cv2.warpAffine
+CV2_DTYPES = {"uint8", "int8", "uint16", "int16", "float32", "float64"}
+
+
+def ttl_cache(maxsize: int = 128, ttl: float = 600) -> Callable:
+    """Cache function results for `ttl` seconds.
+
+    Cache hits are lock-free; a lock is only taken to store a new result.
+    Concurrent misses for the same key may call the function more than once.
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache: Dict[Hashable, Tuple[float, Any]] = {}
+        lock = threading.Lock()
+
+        def store(key: Hashable, value: Any) -> None:
+            with lock:
+                now = time.monotonic()
+                if len(cache) >= maxsize:
+                    for k in [k for k, (expires, _) in cache.items() if expires <= now]:
+                        del cache[k]
+
+                    # Dicts are insertion ordered: drop oldest entries first
+                    while len(cache) >= maxsize:
+                        del cache[next(iter(cache))]
+
+                cache[key] = (now + ttl, value)
+
+        def lookup(key: Hashable) -> Optional[Tuple[float, Any]]:
+            item = cache.get(key)
+            if item is not None and time.monotonic() < item[0]:
+                return item
+
+            return None
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                if item := lookup(key):
+                    return item[1]
+
+                value = await func(*args, **kwargs)
+                store(key, value)
+                return value
+
+            async_wrapper.cache_clear = cache.clear  # type: ignore
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            if item := lookup(key):
+                return item[1]
+
+            value = func(*args, **kwargs)
+            store(key, value)
+            return value
+
+        wrapper.cache_clear = cache.clear  # type: ignore
+        return wrapper
+
+    return decorator
 
 
 def _get_sizes(
@@ -24,9 +97,8 @@ def _get_sizes(
     """Return Output width/height constrained by environment."""
     # use size constraints if present, else full
     if max_area and max_area < (w * h):
-        area_ratio = max_area / (w * h)
-        w = int(w * area_ratio)
-        h = int(h * area_ratio)
+        area = w * h
+        w, h = int(w * max_area // area), int(h * max_area // area)
 
     elif max_width:
         max_height = max_height or max_width
@@ -34,16 +106,372 @@ def _get_sizes(
 
         if w > max_width:
             w = max_width
-            h = int(height * max_width / width)
+            h = int(height * max_width // width)
 
         if h > max_height:
             h = max_height
-            w = int(width * max_height / height)
+            w = int(width * max_height // height)
 
     return w, h
 
 
-def rotate(img: ImageData, angle: float, expand: bool = False, mirrored: bool = False):
+# IIIF Region: full, square, x,y,w,h, pct:x,y,w,h
+_NUMBER = r"(-?\d+(?:\.\d+)?)"
+_REGION_RE = re.compile(rf"^(pct:)?{_NUMBER},{_NUMBER},{_NUMBER},{_NUMBER}$")
+
+# IIIF Size: max, ^max, pct:n, ^pct:n, w,, ,h, w,h, !w,h, ^w,, ^,h, ^w,h, ^!w,h
+_SIZE_RE = re.compile(rf"^(\^)?(?:(max)|pct:{_NUMBER}|(!)?(\d+)?,(\d+)?)$")
+
+
+def _parse_region(region: str, width: int, height: int) -> windows.Window:
+    """Parse IIIF Region parameter and return the window to read."""
+    window = windows.Window(col_off=0, row_off=0, width=width, height=height)
+
+    if region == "full":
+        # The full image is returned, without any cropping.
+        return window
+
+    if region == "square":
+        # The region is defined as an area where the width and height are both equal to the length of the shorter dimension of the full image.
+        # The region may be positioned anywhere in the longer dimension of the full image at the server’s discretion, and centered is often a reasonable default.
+        min_size = min(width, height)
+        x_off = (width - min_size) // 2
+        y_off = (height - min_size) // 2
+        return windows.Window(
+            col_off=x_off, row_off=y_off, width=min_size, height=min_size
+        )
+
+    match = _REGION_RE.match(region)
+    if not match:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid Region parameter: {region}."
+        )
+
+    pct, *values = match.groups()
+    x, y, w, h = map(float, values)
+
+    if pct:
+        # The region to be returned is specified as a sequence of percentages of the full image’s dimensions,
+        # as reported in the image information document.
+        # Thus, x represents the number of pixels from the 0 position on the horizontal axis, calculated as a percentage of the reported width.
+        # w represents the width of the region, also calculated as a percentage of the reported width.
+        # The same applies to y and h respectively.
+        if max(x, y, w, h) > 100 or min(x, y, w, h) < 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid Region parameter: {region}.",
+            )
+
+        xscale, yscale = width / 100, height / 100
+        x = round(xscale * x)
+        y = round(yscale * y)
+        w = round(xscale * w)
+        h = round(yscale * h)
+
+    # else:
+    # The region of the full image to be returned is specified in terms of absolute pixel values.
+    # The value of x represents the number of pixels from the 0 position on the horizontal axis.
+    # The value of y represents the number of pixels from the 0 position on the vertical axis.
+    # Thus the x,y position 0,0 is the upper left-most pixel of the image. w represents
+    # the width of the region and h represents the height of the region in pixels.
+
+    # Service should return an image cropped at the image’s edge, rather than adding empty space.
+    w = width - x if w + x > width else w
+    h = height - y if h + y > height else h
+
+    try:
+        window = windows.Window(col_off=x, row_off=y, width=w, height=h)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid Region parameter: {region}.",
+        ) from e
+
+    if window.width <= 0 or window.height <= 0 or x > width or y > height:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid Region parameter: {region}."
+        )
+
+    return window
+
+
+def _round_div(a: int, b: int) -> int:
+    """Return `round(a / b)` using integer arithmetic (ties to even)."""
+    q, r = divmod(a, b)
+    if 2 * r > b or (2 * r == b and q % 2):
+        q += 1
+
+    return int(q)
+
+
+def _fit_aspect(
+    width: int, height: int, max_width: int, max_height: int
+) -> Tuple[int, int]:
+    """Fit the longest side of `width` x `height` into `max_width` x `max_height`."""
+    if width > height:
+        return max_width, _round_div(max_width * height, width)
+
+    return _round_div(width * max_height, height), max_height
+
+
+def _parse_size(  # noqa: C901
+    size: str,
+    width: int,
+    height: int,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Parse IIIF Size parameter and return the output size for a region of `width` x `height`.
+
+    `max_width` and `max_height` are the server limits used by `^max`.
+
+    """
+    match = _SIZE_RE.match(size)
+    if not match:
+        raise HTTPException(status_code=400, detail=f"Invalid Size parameter: {size}.")
+
+    upscale, max_size, pct, confined, w, h = match.groups()
+
+    out_width, out_height = width, height
+
+    if max_size:
+        # max: The extracted region is returned at the maximum size available, but will not be upscaled.
+        # The resulting image will have the pixel dimensions of the extracted region,
+        # unless it is constrained to a smaller size by maxWidth, maxHeight, or maxArea
+        if upscale:
+            # ^max: The extracted region is scaled to the maximum size permitted by maxWidth, maxHeight, or maxArea.
+            # If the resulting dimensions are greater than the pixel width and height of the extracted region, the extracted region is upscaled.
+            out_width, out_height = _fit_aspect(
+                width,
+                height,
+                max(width, max_width) if max_width else width,
+                max(height, max_height) if max_height else height,
+            )
+
+    elif pct is not None:
+        pct_size = float(pct)
+        if upscale:
+            # ^pct:n: The width and height of the returned image is scaled to n percent of the width and height of the extracted region.
+            # For values of n greater than 100, the extracted region is upscaled.
+            if pct_size <= 0:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid Size parameter: {size} (must be greater than 0).",
+                )
+
+        # pct:n: The width and height of the returned image is scaled to n percent of the width and height of the extracted region.
+        # The value of n must not be greater than 100.
+        elif pct_size > 100 or pct_size <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid Size parameter: {size} (must be between 0 and 100).",
+            )
+
+        out_width = round(out_width / 100 * pct_size)
+        out_height = round(out_height / 100 * pct_size)
+
+    elif confined:
+        # !w,h	The extracted region is scaled so that the width and height of the returned image are not greater than w and h, while maintaining the aspect ratio.
+        # The returned image must be as large as possible but not larger than the extracted region, w or h, or server-imposed limits.
+        # ^!w,h	The extracted region is scaled so that the width and height of the returned image are not greater than w and h, while maintaining the aspect ratio.
+        # The returned image must be as large as possible but not larger than w, h, or server-imposed limits.
+        if not (w and h):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid Size parameter: {size}."
+            )
+
+        out_width, out_height = _fit_aspect(width, height, int(w), int(h))
+
+        if not upscale and (out_width > width or out_height > height):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid 'h,w' parameter: {size} (greater than region height {width},{height}).",
+            )
+
+    elif w and h:
+        # w,h: The width and height of the returned image are exactly w and h.
+        # The aspect ratio of the returned image may be significantly different than the extracted region, resulting in a distorted image.
+        # The values of w and h must not be greater than the corresponding pixel dimensions of the extracted region.
+        # ^w,h:	The width and height of the returned image are exactly w and h.
+        # If w and/or h are greater than the corresponding pixel dimensions of the extracted region, the extracted region is upscaled.
+        out_width, out_height = int(w), int(h)
+        if not upscale and (out_width > width or out_height > height):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid 'h,w' parameter: {size} (greater than region height {width},{height}).",
+            )
+
+    elif w:
+        # w,: The extracted region should be scaled so that the width of the returned image is exactly equal to w.
+        # The value of w must not be greater than the width of the extracted region.
+        # ^w,: If w is greater than the pixel width of the extracted region, the extracted region is upscaled.
+        out_width = int(w)
+        if not upscale and out_width > width:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid 'w' parameter: {out_width} (greater than region width {width}).",
+            )
+        out_height = _round_div(out_width * height, width)
+
+    elif h:
+        # ,h: The extracted region should be scaled so that the height of the returned image is exactly equal to h.
+        # The value of h must not be greater than the height of the extracted region.
+        # ^,h: If h is greater than the pixel height of the extracted region, the extracted region is upscaled.
+        out_height = int(h)
+        if not upscale and out_height > height:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid 'h' parameter: {out_height} (greater than region height {height}).",
+            )
+        out_width = _round_div(width * out_height, height)
+
+    else:
+        raise HTTPException(status_code=400, detail=f"Invalid Size parameter: {size}.")
+
+    return out_width, out_height
+
+
+@functools.lru_cache(maxsize=256)
+def _rotation_transform(
+    angle: float,
+    width: int,
+    height: int,
+    expand: bool = False,
+) -> Tuple[Affine, int, int]:
+    """Return the output -> input pixel transform and the output size of a rotation."""
+    nw = width
+    nh = height
+
+    # rotation around image center
+    rotated_affine = Affine.rotation(-angle, (nw // 2, nh // 2))
+
+    # Adapted from https://github.com/python-pillow/Pillow/blob/acdb882aae391f29e551a09dc678b153c0c04e5b/src/PIL/Image.py#L2297-L2311
+    if expand:
+        xx = []
+        yy = []
+        for x, y in (
+            (0, 0),
+            (width, 0),
+            (width, height),
+            (0, height),
+        ):
+            x, y = rotated_affine * (x, y)
+            xx.append(x)
+            yy.append(y)
+
+        nw = math.ceil(max(xx)) - math.floor(min(xx))
+        nh = math.ceil(max(yy)) - math.floor(min(yy))
+
+        rotated_affine = rotated_affine * Affine.translation(
+            -(nw - width) / 2.0, -(nh - height) / 2.0
+        )
+
+    return rotated_affine, nw, nh
+
+
+def _warp_cv2(
+    array: numpy.ndarray,
+    transform: Affine,
+    width: int,
+    height: int,
+    border_value: float = 0,
+) -> numpy.ndarray:
+    """Apply an inverse (output -> input pixel) affine transform using OpenCV."""
+    # `transform` uses pixel corners (like rasterio.warp.reproject)
+    # while OpenCV expects transformation between pixel centers.
+    a, b, c, d, e, f = transform[:6]
+    matrix = numpy.array(
+        [
+            [a, b, c + (a + b - 1) / 2],
+            [d, e, f + (d + e - 1) / 2],
+        ]
+    )
+
+    return numpy.stack(
+        [
+            cv2.warpAffine(
+                numpy.ascontiguousarray(band),
+                matrix,
+                (width, height),
+                flags=cv2.INTER_NEAREST | cv2.WARP_INVERSE_MAP,
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=(border_value,),
+            )
+            for band in array
+        ]
+    )
+
+
+def _valid_window(mask: numpy.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """Return (row_start, row_stop, col_start, col_stop) if the valid area is a rectangle."""
+    valid = mask == 0
+    rows = valid.any(axis=1)
+    cols = valid.any(axis=0)
+    if not rows.any():
+        return None
+
+    row_start = int(rows.argmax())
+    row_stop = len(rows) - int(rows[::-1].argmax())
+    col_start = int(cols.argmax())
+    col_stop = len(cols) - int(cols[::-1].argmax())
+
+    # Every pixel within the bounding box should be valid
+    if numpy.count_nonzero(valid) != (row_stop - row_start) * (col_stop - col_start):
+        return None
+
+    return row_start, row_stop, col_start, col_stop
+
+
+def _window_mask(
+    window: Tuple[int, int, int, int],
+    transform: Affine,
+    width: int,
+    height: int,
+    margin: float = 0,
+) -> numpy.ndarray:
+    """Create the mask of a rotated rectangular valid area (1=masked).
+
+    Output pixels are valid when their center maps (with `transform`) within
+    the window, like a nearest neighbor warp of the mask would. A `margin`
+    (in input pixels) shrinks the window to stay within the data warped by a
+    backend with less precise coordinates.
+
+    """
+    row_start, row_stop, col_start, col_stop = window
+    a, b, c, d, e, f = transform[:6]
+
+    # Along each output row, the input coordinates are linear in the output column
+    rows = numpy.arange(height) + 0.5
+    start = numpy.zeros(height)
+    stop = numpy.full(height, float(width))
+    for slope, offset, vmin, vmax in [
+        (a, b * rows + c + a * 0.5, col_start + margin, col_stop - margin),
+        (d, e * rows + f + d * 0.5, row_start + margin, row_stop - margin),
+    ]:
+        if abs(slope) < 1e-12:
+            stop[(offset < vmin) | (offset >= vmax)] = 0
+
+        elif slope > 0:
+            start = numpy.maximum(start, numpy.ceil((vmin - offset) / slope))
+            stop = numpy.minimum(stop, numpy.ceil((vmax - offset) / slope))
+
+        else:
+            start = numpy.maximum(start, numpy.floor((vmax - offset) / slope) + 1)
+            stop = numpy.minimum(stop, numpy.floor((vmin - offset) / slope) + 1)
+
+    mask = numpy.ones((1, height, width), dtype="uint8")
+    for row, (col0, col1) in enumerate(
+        zip(start.astype("int64").tolist(), stop.astype("int64").tolist())
+    ):
+        if col0 < col1:
+            mask[0, row, col0:col1] = 0
+
+    return mask
+
+
+def rotate(  # noqa: C901
+    img: ImageData, angle: float, expand: bool = False, mirrored: bool = False
+):
     """Rotate Image.
 
     Args:
@@ -61,61 +489,83 @@ def rotate(img: ImageData, angle: float, expand: bool = False, mirrored: bool =
 
     """
 
+    if angle % 360 == 0 and not mirrored:
+        return img
+
     array = img.array
-    if mirrored:
-        array = numpy.flip(array, axis=2)
 
-    if angle != 0:
+    if angle % 90 == 0 and (expand or angle % 180 == 0):
+        data, mask = array.data, numpy.ma.getmaskarray(array)
+        if mirrored:
+            data, mask = numpy.flip(data, axis=2), numpy.flip(mask, axis=2)
+
+        # Rotations by a multiple of 90 degrees do not need any resampling
+        # (`numpy.rot90` rotates counterclockwise for positive `k`)
+        k = -int(angle // 90) % 4
+        array = numpy.ma.MaskedArray(
+            numpy.ascontiguousarray(numpy.rot90(data, k, axes=(1, 2))),
+            mask=numpy.ascontiguousarray(numpy.rot90(mask, k, axes=(1, 2))),
+        )
+
+    elif angle != 0:
         nband = img.count
-        nw = img.width
-        nh = img.height
-
-        # rotation around image center
-        rotated_affine = Affine.rotation(-angle, (nw // 2, nh // 2))
-
-        # Adapted from https://github.com/python-pillow/Pillow/blob/acdb882aae391f29e551a09dc678b153c0c04e5b/src/PIL/Image.py#L2297-L2311
-        if expand:
-            xx = []
-            yy = []
-            for x, y in (
-                (0, 0),
-                (img.width, 0),
-                (img.width, img.height),
-                (0, img.height),
-            ):
-                x, y = rotated_affine * (x, y)
-                xx.append(x)
-                yy.append(y)
-
-            nw = math.ceil(max(xx)) - math.floor(min(xx))
-            nh = math.ceil(max(yy)) - math.floor(min(yy))
-
-            rotated_affine = rotated_affine * Affine.translation(
-                -(nw - img.width) / 2.0, -(nh - img.height) / 2.0
-            )
+        rotated_affine, nw, nh = _rotation_transform(
+            angle, img.width, img.height, expand
+        )
+        if mirrored:
+            # Mirror the input within the transform instead of flipping (copying) it
+            rotated_affine = Affine(-1, 0, img.width, 0, 1, 0) * rotated_affine
+
+        # 1=True -> means masked
+        src_mask = numpy.ma.getmaskarray(array).astype("uint8")
+
+        # Masks are usually the same for all bands: only rotate one
+        shared_mask = nband > 1 and bool((src_mask == src_mask[:1]).all())
+        if shared_mask:
+            src_mask = src_mask[:1]
+
+        use_cv2 = cv2 is not None and array.dtype.name in CV2_DTYPES
 
         # Rotate the data
-        data = numpy.zeros((nband, nh, nw), dtype=array.data.dtype)
-        _ = reproject(
-            array.data,
-            data,
-            src_crs="epsg:4326",  # Fake CRS
-            src_transform=Affine.identity(),
-            dst_crs="epsg:4326",  # Fake CRS
-            dst_transform=rotated_affine,
-        )
+        if use_cv2:
+            data = _warp_cv2(array.data, rotated_affine, nw, nh)
+
+        else:
+            data = numpy.zeros((nband, nh, nw), dtype=array.data.dtype)
+            _ = reproject(
+                array.data,
+                data,
+                src_crs="epsg:4326",  # Fake CRS
+                src_transform=Affine.identity(),
+                dst_crs="epsg:4326",  # Fake CRS
+                dst_transform=rotated_affine,
+            )
 
         # Rotate the mask
-        mask = numpy.zeros((nband, nh, nw), dtype="uint8") + 1
-        _ = reproject(
-            array.mask * 1,
-            mask,
-            src_crs="epsg:4326",  # Fake CRS
-            src_transform=Affine.identity(),
-            dst_crs="epsg:4326",  # Fake CRS
-            dst_transform=rotated_affine,
-            dst_nodata=1,  # 1=True -> means masked
-        )
+        window = _valid_window(src_mask[0]) if src_mask.shape[0] == 1 else None
+        if window is not None:
+            # OpenCV maps coordinates with fixed-point precision (1/1024 pixel)
+            mask = _window_mask(
+                window, rotated_affine, nw, nh, margin=1 / 256 if use_cv2 else 0
+            )
+
+        elif use_cv2:
+            mask = _warp_cv2(src_mask, rotated_affine, nw, nh, border_value=1)
+
+        else:
+            mask = numpy.ones((src_mask.shape[0], nh, nw), dtype="uint8")
+            _ = reproject(
+                src_mask,
+                mask,
+                src_crs="epsg:4326",  # Fake CRS
+                src_transform=Affine.identity(),
+                dst_crs="epsg:4326",  # Fake CRS
+                dst_transform=rotated_affine,
+                dst_nodata=1,  # 1=True -> means masked
+            )
+
+        if shared_mask:
+            mask = numpy.repeat(mask, nband, axis=0)
 
         array = numpy.ma.MaskedArray(data, mask=mask.astype("bool"))
 
@@ -134,14 +584,18 @@ def image_to_grayscale(img: ImageData) -> ImageData:
         return img
 
     if img.count == 3:
-        data = (
-            img.data[0] * 299 / 1000
-            + img.data[1] * 587 / 1000
-            + img.data[2] * 114 / 1000
-        )
+        if numpy.issubdtype(img.data.dtype, numpy.integer):
+            # Integer approximation of the 0.299/0.587/0.114 weights (sum = 256)
+            # 255 * 256 still fits in uint16, which halves the memory traffic for uint8
+            r, g, b = img.data.astype(
+                "uint16" if img.data.dtype == "uint8" else "uint32"
+            )
+            data = (r * 77 + g * 150 + b * 29) >> 8
+        else:
+            r, g, b = img.data
+            data = r * 0.299 + g * 0.587 + b * 0.114
 
-        data = numpy.ma.MaskedArray(data.astype("uint8"))
-        data.mask = ~img.mask.astype("bool")
+        data = numpy.ma.MaskedArray(data.astype("uint8"), mask=img.mask == 0)
 
         return ImageData(
             data,
@@ -164,10 +618,14 @@ def image_to_bitonal(img: ImageData) -> ImageData:
     All values larger than 127 are set to 255 (white), all other values to 0 (black).
     """
     img = image_to_grayscale(img)
-    arr = numpy.where(img.array > 127, 255, 0).astype("uint8")
+    if img.data.dtype == "uint8":
+        # values > 127 have the high bit set: 1 -> 255 (uint8 wraparound), 0 -> 0
+        data = numpy.negative(img.data >> 7)
+    else:
+        data = numpy.where(img.data > 127, 255, 0).astype("uint8")
 
     return ImageData(
-        arr,
+        numpy.ma.MaskedArray(data, mask=img.array.mask),
         assets=img.assets,
         crs=img.crs,
         bounds=img.bounds,
@@ -176,6 +634,59 @@ def image_to_bitonal(img: ImageData) -> ImageData:
     )
 
 
+def is_fully_valid(img: ImageData) -> bool:
+    """Return True if every pixel is valid in at least one band (i.e `img.mask.all()`)."""
+    mask = numpy.ma.getmask(img.array)
+    # Fast path: nothing is masked
+    if mask is numpy.ma.nomask or not mask.any():
+        return True
+
+    return not numpy.logical_and.reduce(mask).any()
+
+
+def render_image(
+    img: ImageData,
+    img_format: str = "PNG",
+    add_mask: Optional[bool] = None,
+    **kwargs: Any,
+) -> bytes:
+    """Encode Image, using OpenCV (libjpeg-turbo) for 8-bit Gray/RGB JPEG if available.
+
+    By default (`add_mask=None`), display formats (PNG/WEBP) only get an alpha band
+    when some pixels are masked while data formats (NPY, GTiff, ...) always include
+    the mask band so their band count does not depend on the content.
+
+    Note: The OpenCV JPEG encoder ignores `add_mask` (JPEG has no alpha band) and
+    every image profile option except `quality`.
+
+    """
+    if (
+        cv2 is not None
+        and img_format.upper() == "JPEG"
+        and img.data.dtype == "uint8"
+        and img.count in (1, 3)
+    ):
+        # OpenCV expects (height, width, band) arrays in BGR order
+        data = img.data[0] if img.count == 1 else cv2.merge(list(img.data[::-1]))
+        params = [cv2.IMWRITE_JPEG_QUALITY, kwargs.get("quality", 75)]
+        _, content = cv2.imencode(".jpg", data, params)
+        return content.tobytes()
+
+    if add_mask is None:
+        driver = img_format.upper()
+        if driver == "JPEG":
+            # JPEG output has no alpha band
+            add_mask = False
+
+        elif driver in ("PNG", "WEBP"):
+            add_mask = not is_fully_valid(img)
+
+        else:
+            add_mask = True
+
+    return img.render(add_mask=add_mask, img_format=img_format, **kwargs)
+
+
 def accept_media_type(accept: str, mediatypes: List[str]) -> Optional[str]:
     """Return MediaType based on accept header and available mediatype.
 